@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the contact form serialization path.
+
+Compares the original per-request model juggling (request model -> message
+model -> dict -> email dict -> response model -> JSON) with the single-pass
+path used by routes/contact.py, and reports CPU time and allocations per
+request for a submission and for a 50-document list page.
+
+Run from app/backend:  python benchmarks/contact_serialization.py
+"""
+
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.contact import ContactFormRequest, ContactFormResponse, ContactMessage  # noqa: E402
+from utils.serialization import ContactJSONResponse, dumps  # noqa: E402
+
+FORM = {
+    "name": "Sarah Johnson",
+    "email": "sarah.johnson@techcorp.com",
+    "subject": "Resume Submission - Senior Data Analyst Role",
+    "message": "Hello Shubham, I am reaching out regarding the Senior Data Analyst position. " * 4,
+    "phone": "+1-555-0123",
+    "company": "TechCorp Solutions",
+}
+
+def _stored_documents(count: int) -> list:
+    return [
+        dict(ContactMessage(**FORM).model_dump(), _id=index, submitted_at=datetime(2025, 1, 1, 12, 0, index % 60))
+        for index in range(count)
+    ]
+
+def legacy_submit():
+    form_data = ContactFormRequest(**FORM)
+    contact_message = ContactMessage(
+        name=form_data.name,
+        email=form_data.email,
+        subject=form_data.subject,
+        message=form_data.message,
+        phone=form_data.phone,
+        company=form_data.company,
+        ip_address="127.0.0.1",
+        user_agent="bench",
+    )
+    contact_message.dict()
+    {
+        "name": contact_message.name,
+        "email": contact_message.email,
+        "subject": contact_message.subject,
+        "message": contact_message.message,
+        "phone": contact_message.phone,
+        "company": contact_message.company,
+        "submitted_at": contact_message.submitted_at.strftime("%Y-%m-%d %H:%M:%S UTC"),
+        "has_attachment": contact_message.has_attachment,
+        "attachment_filename": contact_message.attachment_filename,
+    }
+    response = ContactFormResponse(
+        id=contact_message.id,
+        name=contact_message.name,
+        email=contact_message.email,
+        subject=contact_message.subject,
+        message=contact_message.message,
+        phone=contact_message.phone,
+        company=contact_message.company,
+        submitted_at=contact_message.submitted_at,
+        status=contact_message.status,
+        has_attachment=contact_message.has_attachment,
+        attachment_filename=contact_message.attachment_filename,
+    )
+    return dumps(response.model_dump())
+
+def fast_submit():
+    form_data = ContactFormRequest(**FORM)
+    contact_message = ContactMessage.from_form(form_data, ip_address="127.0.0.1", user_agent="bench")
+    document = contact_message.model_dump()
+    contact_message.email_context()
+    return ContactJSONResponse(document).body
+
+def legacy_list(documents):
+    return dumps([
+        ContactFormResponse(
+            id=msg["id"],
+            name=msg["name"],
+            email=msg["email"],
+            subject=msg["subject"],
+            message=msg["message"],
+            phone=msg.get("phone"),
+            company=msg.get("company"),
+            submitted_at=msg["submitted_at"],
+            status=msg.get("status", "pending"),
+            has_attachment=msg.get("has_attachment", False),
+            attachment_filename=msg.get("attachment_filename"),
+        ).model_dump()
+        for msg in documents
+    ])
+
+def fast_list(documents):
+    return ContactJSONResponse(documents).body
+
+def measure(label: str, func, *args, iterations: int = 2000):
+    for _ in range(50):
+        func(*args)
+
+    started = time.process_time()
+    for _ in range(iterations):
+        func(*args)
+    cpu_us = (time.process_time() - started) / iterations * 1e6
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<16} cpu={cpu_us:9.1f}us/req  peak_alloc={peak / 1024:8.1f}KiB/req")
+
+def main():
+    documents = _stored_documents(50)
+
+    print("=== Contact submission ===")
+    measure("legacy", legacy_submit)
+    measure("single-pass", fast_submit)
+
+    print("\n=== Contact list (50 documents) ===")
+    measure("legacy", legacy_list, documents, iterations=200)
+    measure("single-pass", fast_list, documents, iterations=200)
+
+if __name__ == "__main__":
+    main()
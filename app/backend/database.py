@@ -1,4 +1,5 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
 import os
 from dotenv import load_dotenv
 from pathlib import Path
@@ -11,6 +12,28 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+async def ensure_tenant_indexes(prefix: str = ""):
+    """Create the indexes used by one tenant's collections"""
+    messages = db[f"{prefix}contact_messages"]
+    await messages.create_index("id", unique=True)
+    await messages.create_index([("submitted_at", -1)])
+    # Equality filter first, then the sort/range key, for GET /api/contact filters
+    for field in ("status", "email", "company", "has_attachment", "geo_country_code", "ua_device", "ua_browser"):
+        await messages.create_index([(field, 1), ("submitted_at", -1)])
+    await messages.create_index("attachment_path", sparse=True)
+    await db[f"{prefix}portfolio_content"].create_index([("kind", 1), ("revision", 1), ("order", 1)])
+    # Suppression windows expire on their own once expires_at passes
+    await db[f"{prefix}auto_reply_suppression"].create_index("expires_at", expireAfterSeconds=0)
+
+async def ensure_indexes():
+    """Create indexes used by the API and maintenance jobs"""
+    await ensure_tenant_indexes()
+    await db.tenants.create_index("hosts")
+
+async def warm_connection_pool(connections: int):
+    """Open ``connections`` pooled connections up front with concurrent pings"""
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(connections)))
+
 async def close_db_connection():
     """Close database connection"""
     client.close()
\ No newline at end of file
@@ -0,0 +1,92 @@
+import json
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.metrics import metrics
+
+class _BodyTooLarge(Exception):
+    pass
+
+class BodySizeLimitMiddleware:
+    """Rejects oversized request bodies with 413 before they are parsed.
+
+    ``limits`` maps (method, path) to a byte limit; other requests use
+    ``default_limit`` (None disables the check). A declared Content-Length
+    over the limit is rejected without reading the body. Otherwise bytes
+    are counted as they stream in and reading stops as soon as the limit
+    is crossed, so chunked uploads cannot get around the check either.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Dict[Tuple[str, str], int], default_limit: Optional[int] = None):
+        self.app = app
+        self.limits = limits
+        self.default_limit = default_limit
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.limits.get((scope["method"], scope["path"]), self.default_limit)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length is not None:
+            try:
+                declared = int(content_length)
+            except ValueError:
+                declared = 0
+            if declared > limit:
+                await self._reject(send, limit)
+                return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def receive_wrapper() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def send_wrapper(message: Message):
+            nonlocal response_started
+            if exceeded:
+                # The app turned the aborted read into its own error; answer 413 instead
+                if message["type"] == "http.response.start" and not response_started:
+                    response_started = True
+                    await self._reject(send, limit)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except _BodyTooLarge:
+            pass
+        if exceeded and not response_started:
+            await self._reject(send, limit)
+
+    async def _reject(self, send: Send, limit: int):
+        metrics.incr("requests_rejected_body_too_large")
+        body = json.dumps({"detail": f"Request body too large. Maximum allowed: {limit} bytes"}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,32 @@
+from typing import Dict, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+class CacheControlMiddleware:
+    """Applies per-route Cache-Control policies.
+
+    ``policies`` maps (method, path) to a Cache-Control value. A route that
+    sets its own Cache-Control header keeps it.
+    """
+
+    def __init__(self, app: ASGIApp, policies: Dict[Tuple[str, str], str]):
+        self.app = app
+        self.policies = policies
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        policy = None
+        if scope["type"] == "http":
+            policy = self.policies.get((scope["method"], scope["path"]))
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                if "cache-control" not in headers:
+                    headers["Cache-Control"] = policy
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,44 @@
+import json
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from services.lifecycle import Lifecycle
+
+class DrainMiddleware:
+    """Counts in-flight HTTP requests and turns new ones away while draining.
+
+    Paths in ``always_allow`` (health and readiness probes) are still served
+    during a drain so orchestrators can observe it.
+    """
+
+    def __init__(self, app: ASGIApp, lifecycle: Lifecycle, always_allow=(), retry_after: int = 5):
+        self.app = app
+        self.lifecycle = lifecycle
+        self.always_allow = set(always_allow)
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if self.lifecycle.draining and scope["path"] not in self.always_allow:
+            body = json.dumps({"detail": "Server is shutting down"}).encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"retry-after", str(self.retry_after).encode("latin-1")),
+                    (b"connection", b"close"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        self.lifecycle.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.lifecycle.request_finished()
@@ -0,0 +1,43 @@
+import json
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from services.tenants import tenant_registry, set_current_tenant, reset_current_tenant
+
+class TenantMiddleware:
+    """Resolves the tenant for each request and strips any /t/<tenant> prefix.
+
+    Runs outermost so path-based policies further in (body limits, cache
+    control, routing) see the plain /api/... path.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tenant_registry.refresh_if_stale()
+        tenant, path = tenant_registry.resolve(Headers(scope=scope).get("host", ""), scope["path"])
+        if tenant is None:
+            body = json.dumps({"detail": "Unknown tenant"}).encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 404,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode("latin-1"))],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        if path != scope["path"]:
+            scope = dict(scope, path=path, raw_path=path.encode("utf-8"))
+        tenant_registry.ensure_indexes(tenant)
+
+        token = set_current_tenant(tenant)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_current_tenant(token)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import datetime
 import uuid
 
@@ -42,6 +42,15 @@ class ContactFormResponse(BaseModel):
     has_attachment: bool = False
     attachment_filename: Optional[str] = None
 
+class ContactMessageAdminResponse(ContactFormResponse):
+    """Admin view of a message, with the client details inferred at submission"""
+    ua_browser: Optional[str] = None
+    ua_os: Optional[str] = None
+    ua_device: Optional[str] = None
+    geo_country_code: Optional[str] = None
+    geo_country: Optional[str] = None
+    geo_city: Optional[str] = None
+
 class ContactMessage(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
@@ -59,12 +68,96 @@ class ContactMessage(BaseModel):
     attachment_path: Optional[str] = None
     attachment_size: Optional[int] = None
     attachment_type: Optional[str] = None
+    attachment_stored_size: Optional[int] = None
+    attachment_compression: Optional[str] = None
+    # Derived from user_agent and ip_address when the message is received
+    ua_browser: Optional[str] = None
+    ua_browser_version: Optional[str] = None
+    ua_os: Optional[str] = None
+    ua_device: Optional[str] = None
+    geo_country_code: Optional[str] = None
+    geo_country: Optional[str] = None
+    geo_city: Optional[str] = None
     
     class Config:
         json_encoders = {
             datetime: lambda v: v.isoformat()
         }
 
+    @classmethod
+    def from_form(cls, form_data: ContactFormRequest, **extra) -> "ContactMessage":
+        """Build a message from an already validated form without validating it again"""
+        return cls.model_construct(**form_data.model_dump(), **extra)
+
+    def email_context(self) -> dict:
+        """Template context shared by the notification and auto-reply emails"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "email": self.email,
+            "subject": self.subject,
+            "message": self.message,
+            "phone": self.phone,
+            "company": self.company,
+            "submitted_at": self.submitted_at.strftime("%Y-%m-%d %H:%M:%S UTC"),
+            "has_attachment": self.has_attachment,
+            "attachment_filename": self.attachment_filename,
+            "attachment_path": self.attachment_path,
+            "attachment_size": self.attachment_size,
+            "attachment_type": self.attachment_type
+        }
+
+class ContactMessageQuery(BaseModel):
+    """Filters for listing contact messages; each one is backed by a compound index ending in submitted_at"""
+    status: Optional[Literal["pending", "read", "replied", "archived"]] = None
+    submitted_after: Optional[datetime] = Field(None, description="Inclusive lower bound on submitted_at")
+    submitted_before: Optional[datetime] = Field(None, description="Exclusive upper bound on submitted_at")
+    has_attachment: Optional[bool] = None
+    email: Optional[str] = Field(None, max_length=254, description="Exact sender email address")
+    company: Optional[str] = Field(None, max_length=100, description="Exact company name")
+    country: Optional[str] = Field(None, min_length=2, max_length=2, description="ISO country code of the sender's IP")
+    device: Optional[Literal["desktop", "mobile", "tablet", "bot"]] = None
+    browser: Optional[str] = Field(None, max_length=50)
+
+    @property
+    def empty_range(self) -> bool:
+        return bool(self.submitted_after and self.submitted_before and self.submitted_after >= self.submitted_before)
+
+    def to_query(self) -> dict:
+        query = {
+            name: value
+            for name, value in (
+                ("status", self.status),
+                ("has_attachment", self.has_attachment),
+                ("email", self.email),
+                ("company", self.company),
+                ("geo_country_code", self.country.upper() if self.country else None),
+                ("ua_device", self.device),
+                ("ua_browser", self.browser),
+            )
+            if value is not None
+        }
+        submitted_at = {}
+        if self.submitted_after:
+            submitted_at["$gte"] = self.submitted_after
+        if self.submitted_before:
+            submitted_at["$lt"] = self.submitted_before
+        if submitted_at:
+            query["submitted_at"] = submitted_at
+        return query
+
+def _response_fields(model) -> dict:
+    return {
+        name: (None if field.is_required() else field.get_default())
+        for name, field in model.model_fields.items()
+    }
+
+# Fields exposed by the API, with the defaults used for documents that predate them.
+# Submitters get the public fields; admin endpoints also see the enrichment fields.
+CONTACT_PUBLIC_FIELDS = _response_fields(ContactFormResponse)
+CONTACT_ADMIN_FIELDS = _response_fields(ContactMessageAdminResponse)
+CONTACT_ADMIN_PROJECTION = {"_id": 0, **{name: 1 for name in CONTACT_ADMIN_FIELDS}}
+
 class EmailTemplate(BaseModel):
     to_email: str
     subject: str
@@ -0,0 +1,41 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class Project(BaseModel):
+    id: int
+    title: str = Field(..., min_length=1, max_length=200)
+    description: str
+    longDescription: Optional[str] = None
+    technologies: List[str] = []
+    category: str
+    image: Optional[str] = None
+    demoUrl: Optional[str] = None
+    githubUrl: Optional[str] = None
+    featured: bool = False
+    completedAt: Optional[str] = None
+
+class Skill(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    level: int = Field(..., ge=0, le=100)
+    category: str
+
+class Experience(BaseModel):
+    id: int
+    title: str
+    company: str
+    period: str
+    description: str
+
+class SocialLink(BaseModel):
+    name: str
+    url: str
+    icon: str
+
+# Content kinds stored in the portfolio_content collection, keyed by the
+# names the frontend uses
+CONTENT_MODELS = {
+    "projects": Project,
+    "skills": Skill,
+    "experiences": Experience,
+    "socialLinks": SocialLink,
+}
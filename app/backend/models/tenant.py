@@ -0,0 +1,47 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
+import os
+
+DEFAULT_TENANT_ID = "default"
+
+class Tenant(BaseModel):
+    id: str = Field(..., min_length=1, max_length=64, pattern=r"^[a-zA-Z0-9_-]+$")
+    hosts: List[str] = []
+    # Prefix for the tenant's own collections; the default tenant uses the unprefixed names
+    collection_prefix: Optional[str] = None
+    to_email: Optional[str] = None
+    from_email: Optional[str] = None
+    from_name: Optional[str] = None
+    smtp_host: Optional[str] = None
+    smtp_port: Optional[int] = None
+    smtp_username: Optional[str] = None
+    # Name of the environment variable holding the SMTP password; secrets never live in the tenants collection
+    smtp_password_env: Optional[str] = Field(None, pattern=r"^[A-Z_][A-Z0-9_]*$")
+
+    @model_validator(mode="before")
+    @classmethod
+    def reject_plaintext_password(cls, data):
+        if isinstance(data, dict) and data.get("smtp_password"):
+            raise ValueError("smtp_password must not be stored in tenant config; set smtp_password_env instead")
+        return data
+
+    @model_validator(mode="after")
+    def default_collection_prefix(self):
+        if self.collection_prefix is None:
+            self.collection_prefix = "" if self.id == DEFAULT_TENANT_ID else f"t_{self.id}__"
+        return self
+
+    def collection_name(self, name: str) -> str:
+        return f"{self.collection_prefix}{name}"
+
+    @property
+    def email_settings(self) -> dict:
+        """SMTP and address overrides; unset values fall back to the environment"""
+        settings = self.model_dump(include={
+            "to_email", "from_email", "from_name", "smtp_host", "smtp_port", "smtp_username"
+        }, exclude_none=True)
+        if self.smtp_host or self.smtp_username or self.smtp_password_env:
+            # Never hand the shared SMTP credentials to a tenant's own server
+            settings.setdefault("smtp_username", None)
+            settings["smtp_password"] = os.getenv(self.smtp_password_env) if self.smtp_password_env else None
+        return settings
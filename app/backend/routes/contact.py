@@ -1,18 +1,48 @@
 from fastapi import APIRouter, HTTPException, Depends, File, UploadFile, Form, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Optional, List
+import asyncio
 import logging
-from datetime import datetime
+import os
+from urllib.parse import quote
+from datetime import datetime, timedelta
 
-from models.contact import ContactFormRequest, ContactFormResponse, ContactMessage
-from services.email_service import email_service
+from models.contact import ContactFormRequest, ContactFormResponse, ContactMessage, ContactMessageAdminResponse, ContactMessageQuery, CONTACT_ADMIN_PROJECTION
+from services.tenants import current_tenant, tenant_collection, tenant_email_service, TENANT_PATH_PREFIX
+from models.tenant import DEFAULT_TENANT_ID
+from services.notification_digest import notification_digest
+from services.spam_filter import spam_filter
+from services.query_guard import query_guard
+from services.attachment_export import attachment_exporter, EXPORT_PROJECTION
+from services.enrichment import submission_enricher
+from services.auto_reply_suppression import auto_reply_suppressor
+from services.change_feed import contact_change_feed, OVERFLOW
+from utils.admin_auth import require_admin
+from utils.circuit_breaker import CircuitOpenError
+from utils.client_ip import client_ip
 from utils.file_handler import file_handler
-from database import db
+from utils.serialization import AdminContactJSONResponse, ContactJSONResponse
+from utils.signed_urls import attachment_links
+from utils.tracing import mark_since_request_start, span
+from utils.http_cache import bump_write_generation, compute_etag, etag_matches, get_write_generation, not_modified
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+STATS_DEFAULT_DAYS = int(os.getenv('CONTACT_STATS_DEFAULT_DAYS', '90'))
+
+def contact_messages():
+    """The current tenant's contact_messages collection"""
+    return tenant_collection("contact_messages")
+
+async def _record_write():
+    """Bump the contact_messages write generation so cached list ETags go stale"""
+    try:
+        await bump_write_generation(contact_messages().name)
+    except Exception as e:
+        logger.error(f"Failed to bump contact_messages write generation: {str(e)}")
+
 @router.post("/contact", response_model=ContactFormResponse)
 async def submit_contact_form(
     request: Request,
@@ -22,94 +52,106 @@ async def submit_contact_form(
     message: str = Form(...),
     phone: Optional[str] = Form(None),
     company: Optional[str] = Form(None),
+    website: Optional[str] = Form(None),
+    form_started_at: Optional[float] = Form(None),
     file: Optional[UploadFile] = File(None)
 ):
     """Submit contact form with optional file attachment"""
+    # Multipart parsing happens before the handler is entered
+    mark_since_request_start("parse")
     try:
         # Validate form data
-        form_data = ContactFormRequest(
-            name=name,
-            email=email,
-            subject=subject,
-            message=message,
-            phone=phone,
-            company=company
-        )
+        with span("validate"):
+            form_data = ContactFormRequest(
+                name=name,
+                email=email,
+                subject=subject,
+                message=message,
+                phone=phone,
+                company=company
+            )
+            
+        # Parse the user agent and geolocate the IP (memoized lookups); behind the
+        # ingress the socket peer is the proxy, so take the forwarded client address
+        with span("enrich"):
+            ip_address = client_ip.for_request(request)
+            user_agent = request.headers.get("user-agent")
+            client_fields = submission_enricher.fields(ip_address, user_agent)
         
-        # Create contact message
-        contact_message = ContactMessage(
-            name=form_data.name,
-            email=form_data.email,
-            subject=form_data.subject,
-            message=form_data.message,
-            phone=form_data.phone,
-            company=form_data.company,
-            ip_address=request.client.host,
-            user_agent=request.headers.get("user-agent")
+        # Create contact message from the validated form
+        contact_message = ContactMessage.from_form(
+            form_data,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            **client_fields
         )
         
+        # Score before anything is written; likely spam is quarantined without emails
+        with span("spam"):
+            verdict = spam_filter.evaluate(
+                email=contact_message.email,
+                subject=contact_message.subject,
+                message=contact_message.message,
+                ip_address=contact_message.ip_address,
+                honeypot=website,
+                form_started_at=form_started_at
+            )
+        if verdict.is_spam:
+            document = contact_message.model_dump()
+            await spam_filter.quarantine(document, verdict)
+            return ContactJSONResponse(document)
+        
         # Handle file upload if present
         if file and file.filename:
-            is_valid, validation_message, file_path = file_handler.save_file(file, "contact")
+            with span("save_file"):
+                is_valid, validation_message, file_path = file_handler.save_file(file, "contact")
             if not is_valid:
                 raise HTTPException(status_code=400, detail=validation_message)
             
             if file_path:
+                with span("compress_file"):
+                    stored_path, stored_size, compression = await file_handler.compress_stored(file_path, file.content_type)
                 contact_message.has_attachment = True
                 contact_message.attachment_filename = file.filename
-                contact_message.attachment_path = file_path
+                contact_message.attachment_path = stored_path
                 contact_message.attachment_size = file.size
                 contact_message.attachment_type = file.content_type
+                contact_message.attachment_stored_size = stored_size
+                contact_message.attachment_compression = compression
         
         # Save to database
-        result = await db.contact_messages.insert_one(contact_message.dict())
+        document = contact_message.model_dump()
+        with span("db_insert"):
+            result = await contact_messages().insert_one(document)
         
         if not result.inserted_id:
             raise HTTPException(status_code=500, detail="Failed to save contact message")
         
+        await _record_write()
+        
         # Prepare email data
-        email_data = {
-            "name": contact_message.name,
-            "email": contact_message.email,
-            "subject": contact_message.subject,
-            "message": contact_message.message,
-            "phone": contact_message.phone,
-            "company": contact_message.company,
-            "submitted_at": contact_message.submitted_at.strftime("%Y-%m-%d %H:%M:%S UTC"),
-            "has_attachment": contact_message.has_attachment,
-            "attachment_filename": contact_message.attachment_filename
-        }
+        email_data = contact_message.email_context()
+        if contact_message.has_attachment:
+            email_data["attachment_link"] = _attachment_link(contact_message.id)
         
-        # Send notification email (non-blocking)
+        # Send or queue notification email (non-blocking)
         try:
-            notification_sent = email_service.send_contact_form_notification(email_data)
+            with span("email_notify"):
+                notification_sent = await notification_digest.notify(email_data)
             if not notification_sent:
                 logger.warning("Failed to send notification email")
         except Exception as e:
             logger.error(f"Email notification error: {str(e)}")
         
-        # Send auto-reply (non-blocking)
+        # Send auto-reply (non-blocking), at most once per sender within the suppression window
         try:
-            auto_reply_sent = email_service.send_auto_reply(email_data)
-            if not auto_reply_sent:
-                logger.warning("Failed to send auto-reply email")
+            with span("email_auto_reply"):
+                await _send_auto_reply(contact_message.id, contact_message.email, email_data)
         except Exception as e:
             logger.error(f"Auto-reply error: {str(e)}")
         
         # Return response
-        return ContactFormResponse(
-            id=contact_message.id,
-            name=contact_message.name,
-            email=contact_message.email,
-            subject=contact_message.subject,
-            message=contact_message.message,
-            phone=contact_message.phone,
-            company=contact_message.company,
-            submitted_at=contact_message.submitted_at,
-            status=contact_message.status,
-            has_attachment=contact_message.has_attachment,
-            attachment_filename=contact_message.attachment_filename
-        )
+        return ContactJSONResponse(document)
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -117,45 +159,227 @@ async def submit_contact_form(
         logger.error(f"Contact form submission error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@router.get("/contact", response_model=List[ContactFormResponse])
+async def _send_auto_reply(message_id: str, email: str, email_data: dict) -> bool:
+    """Send the auto-reply unless the sender already got one within the suppression window"""
+    service = tenant_email_service()
+    if service.circuit.is_open:
+        # Skip without claiming the suppression window, so the next submission can still get one
+        logger.warning("SMTP circuit open, skipping auto-reply for message %s", message_id)
+        return False
+    if not await auto_reply_suppressor.should_send(email):
+        logger.info("Suppressed auto-reply for message %s: sender already answered within the window", message_id)
+        return False
+
+    try:
+        auto_reply_sent = await asyncio.to_thread(service.send_auto_reply, email_data)
+    except CircuitOpenError:
+        # Refused before trying, e.g. half-open with its trial call taken
+        auto_reply_sent = False
+    if not auto_reply_sent:
+        # Nothing went out: free the window so the sender's next submission can still get one
+        await auto_reply_suppressor.release(email)
+        logger.warning("Failed to send auto-reply email")
+    return auto_reply_sent
+
+@router.get("/contact", response_model=List[ContactMessageAdminResponse], dependencies=[Depends(require_admin)])
 async def get_contact_messages(
+    request: Request,
     limit: int = 50,
     skip: int = 0,
-    status: Optional[str] = None
+    filters: ContactMessageQuery = Depends()
 ):
     """Get contact messages (admin endpoint)"""
     try:
         # Build query
-        query = {}
-        if status:
-            query["status"] = status
+        if filters.empty_range:
+            raise HTTPException(status_code=400, detail="submitted_after must be earlier than submitted_before")
+        query = filters.to_query()
+        sort = [("submitted_at", -1)]
+        
+        # Refuse (or cap) filter combinations no index can serve
+        max_time_ms = None
+        verdict = await query_guard.check(contact_messages(), query, sort)
+        if verdict.collection_scan:
+            if query_guard.policy != "cap":
+                raise HTTPException(status_code=400, detail="This filter combination is not supported by an index")
+            limit = min(limit, query_guard.capped_limit)
+            max_time_ms = query_guard.capped_max_time_ms
+        
+        # Revalidate against the write generation and newest submission before running the full query
+        generation, latest = await asyncio.gather(
+            get_write_generation(contact_messages().name),
+            contact_messages().find_one(query, {"_id": 0, "submitted_at": 1}, sort=sort, max_time_ms=max_time_ms)
+        )
+        etag = compute_etag(
+            contact_messages().name, generation, latest["submitted_at"] if latest else None,
+            filters.model_dump_json(exclude_none=True), skip, limit
+        )
+        if etag_matches(request, etag):
+            return not_modified(etag)
         
-        # Fetch from database
-        cursor = db.contact_messages.find(query).skip(skip).limit(limit).sort("submitted_at", -1)
+        # Fetch from database, projected onto the response fields
+        cursor = contact_messages().find(query, CONTACT_ADMIN_PROJECTION).skip(skip).limit(limit).sort(sort)
+        if max_time_ms is not None:
+            cursor = cursor.max_time_ms(max_time_ms)
         messages = await cursor.to_list(length=limit)
         
-        # Convert to response format
-        return [
-            ContactFormResponse(
-                id=msg["id"],
-                name=msg["name"],
-                email=msg["email"],
-                subject=msg["subject"],
-                message=msg["message"],
-                phone=msg.get("phone"),
-                company=msg.get("company"),
-                submitted_at=msg["submitted_at"],
-                status=msg.get("status", "pending"),
-                has_attachment=msg.get("has_attachment", False),
-                attachment_filename=msg.get("attachment_filename")
-            )
-            for msg in messages
-        ]
+        return AdminContactJSONResponse(messages, headers={"ETag": etag})
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Get contact messages error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.get("/contact/stats", dependencies=[Depends(require_admin)])
+async def get_contact_stats(filters: ContactMessageQuery = Depends()):
+    """Message counts by country, device, browser and OS for the matching messages (admin endpoint)
+
+    Without ``submitted_after`` the counts cover the last ``CONTACT_STATS_DEFAULT_DAYS`` days,
+    so an unfiltered request is still an index range scan rather than a full collection scan.
+    """
+    if filters.submitted_after is None:
+        filters.submitted_after = datetime.utcnow() - timedelta(days=STATS_DEFAULT_DAYS)
+    if filters.empty_range:
+        raise HTTPException(status_code=400, detail="submitted_after must be earlier than submitted_before")
+    
+    try:
+        facets = {
+            name: [
+                {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1}},
+                {"$limit": 50}
+            ]
+            for name, field in (
+                ("by_country", "geo_country_code"),
+                ("by_device", "ua_device"),
+                ("by_browser", "ua_browser"),
+                ("by_os", "ua_os"),
+            )
+        }
+        facets["total"] = [{"$count": "count"}]
+        pipeline = [{"$match": filters.to_query()}, {"$facet": facets}]
+        
+        # Explain the pipeline itself: a find() with a sort can pick an index the aggregation won't
+        options = {}
+        verdict = await query_guard.check_aggregate(contact_messages(), pipeline)
+        if verdict.collection_scan:
+            if query_guard.policy != "cap":
+                raise HTTPException(status_code=400, detail="This filter combination is not supported by an index")
+            options["maxTimeMS"] = query_guard.capped_max_time_ms
+        
+        cursor = contact_messages().aggregate(pipeline, **options)
+        result = (await cursor.to_list(length=1))[0]
+        
+        stats = {"submitted_after": filters.submitted_after, "total": result["total"][0]["count"] if result["total"] else 0}
+        for name in ("by_country", "by_device", "by_browser", "by_os"):
+            stats[name] = [{"value": bucket["_id"], "count": bucket["count"]} for bucket in result[name]]
+        return stats
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Contact stats error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/contact/events", dependencies=[Depends(require_admin)])
+async def stream_contact_events(request: Request):
+    """Server-Sent Events feed of new submissions and status changes (admin endpoint)"""
+    last_event_id = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+    subscriber, replay, complete = contact_change_feed.subscribe(last_event_id)
+    
+    async def event_stream():
+        try:
+            yield b"retry: 3000\n\n"
+            if not complete:
+                # Missed events are no longer buffered; the client should refetch the list
+                yield b"event: resync\ndata: {}\n\n"
+            for frame in replay:
+                yield frame
+            
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscriber.queue.get(), timeout=contact_change_feed.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if frame is OVERFLOW:
+                    return
+                yield frame
+        finally:
+            contact_change_feed.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/contact/attachments/export", dependencies=[Depends(require_admin)])
+async def export_contact_attachments(
+    limit: int = 500,
+    filters: ContactMessageQuery = Depends()
+):
+    """Stream the attachments of matching messages as a ZIP archive with a manifest (admin endpoint)"""
+    if filters.has_attachment is False:
+        raise HTTPException(status_code=400, detail="Only messages with attachments can be exported")
+    if filters.empty_range:
+        raise HTTPException(status_code=400, detail="submitted_after must be earlier than submitted_before")
+    
+    query = {**filters.to_query(), "has_attachment": True}
+    sort = [("submitted_at", -1)]
+    verdict = await query_guard.check(contact_messages(), query, sort)
+    if verdict.collection_scan:
+        raise HTTPException(status_code=400, detail="This filter combination is not supported by an index")
+    
+    limit = max(1, min(limit, attachment_exporter.max_messages))
+    cursor = contact_messages().find(query, EXPORT_PROJECTION).sort(sort).limit(limit)
+    filename = f"contact-attachments-{datetime.utcnow():%Y%m%dT%H%M%SZ}.zip"
+    return StreamingResponse(
+        attachment_exporter.stream(cursor),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"}
+    )
+
+def _attachment_link(message_id: str) -> Optional[str]:
+    """Signed download link for the owner notification, routed to the current tenant"""
+    tenant = current_tenant()
+    prefix = "" if tenant.id == DEFAULT_TENANT_ID else f"{TENANT_PATH_PREFIX}{tenant.id}"
+    return attachment_links.link(tenant.id, message_id, prefix)
+
+@router.get("/contact/{message_id}/attachment")
+async def download_contact_attachment(
+    message_id: str,
+    expires: Optional[int] = None,
+    signature: Optional[str] = None
+):
+    """Download a message's attachment through the signed link from the owner notification"""
+    if expires is None or signature is None or not attachment_links.verify(current_tenant().id, message_id, expires, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired download link")
+    return await _attachment_response(message_id)
+
+@router.get("/admin/contact/{message_id}/attachment", dependencies=[Depends(require_admin)])
+async def download_contact_attachment_admin(message_id: str):
+    """Download a message's attachment as originally uploaded (admin endpoint)"""
+    return await _attachment_response(message_id)
+
+async def _attachment_response(message_id: str) -> StreamingResponse:
+    message = await contact_messages().find_one(
+        {"id": message_id},
+        {"_id": 0, "attachment_path": 1, "attachment_filename": 1, "attachment_type": 1}
+    )
+    if not message or not message.get("attachment_path"):
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    if not os.path.exists(message["attachment_path"]):
+        raise HTTPException(status_code=404, detail="Attachment file missing")
+    
+    filename = quote(message.get("attachment_filename") or os.path.basename(message["attachment_path"]))
+    return StreamingResponse(
+        file_handler.iter_file(message["attachment_path"]),
+        media_type=message.get("attachment_type") or "application/octet-stream",
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{filename}"}
+    )
+
 @router.patch("/contact/{message_id}/status")
 async def update_contact_message_status(
     message_id: str,
@@ -166,14 +390,23 @@ async def update_contact_message_status(
         if status not in ["pending", "read", "replied", "archived"]:
             raise HTTPException(status_code=400, detail="Invalid status")
         
-        result = await db.contact_messages.update_one(
+        message = await contact_messages().find_one_and_update(
             {"id": message_id},
-            {"$set": {"status": status}}
+            {"$set": {"status": status}},
+            projection={"_id": 0, "id": 1, "subject": 1, "message": 1, "spam_trained_as": 1}
         )
         
-        if result.matched_count == 0:
+        if message is None:
             raise HTTPException(status_code=404, detail="Message not found")
         
+        await _record_write()
+        
+        # Archived and replied messages train the spam classifier
+        try:
+            await spam_filter.train_from_status(message, status)
+        except Exception as e:
+            logger.error(f"Spam model training error: {str(e)}")
+        
         return {"message": "Status updated successfully", "status": status}
         
     except Exception as e:
@@ -185,7 +418,7 @@ async def delete_contact_message(message_id: str):
     """Delete contact message"""
     try:
         # Get message first to check for attachments
-        message = await db.contact_messages.find_one({"id": message_id})
+        message = await contact_messages().find_one({"id": message_id})
         if not message:
             raise HTTPException(status_code=404, detail="Message not found")
         
@@ -194,11 +427,13 @@ async def delete_contact_message(message_id: str):
             file_handler.delete_file(message["attachment_path"])
         
         # Delete from database
-        result = await db.contact_messages.delete_one({"id": message_id})
+        result = await contact_messages().delete_one({"id": message_id})
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Message not found")
         
+        await _record_write()
+        
         return {"message": "Message deleted successfully"}
         
     except Exception as e:
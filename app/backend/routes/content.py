@@ -0,0 +1,77 @@
+from fastapi import APIRouter, HTTPException, Request, Body, Depends
+from fastapi.responses import Response
+from typing import Any, Dict, List, Optional
+import logging
+
+from models.content import CONTENT_MODELS, Project, Skill, Experience, SocialLink
+from services.content_service import content_service, ContentPayload
+from middleware.compression import negotiate_encoding
+from utils.admin_auth import require_admin
+from utils.http_cache import etag_matches, not_modified
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+def _payload_response(request: Request, payload: ContentPayload) -> Response:
+    """Serve a precomputed payload in the best encoding the client accepts"""
+    if etag_matches(request, payload.etag):
+        return not_modified(payload.etag)
+
+    body, encoding = payload.encoded(negotiate_encoding(request.headers.get("accept-encoding", "")))
+    headers = {"ETag": payload.etag, "Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def _serve(request: Request, kind: str, **filters) -> Response:
+    try:
+        payload = await content_service.get(kind, **filters)
+    except Exception as e:
+        logger.error(f"Get {kind} error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    return _payload_response(request, payload)
+
+@router.get("/projects", response_model=List[Project])
+async def get_projects(
+    request: Request,
+    category: Optional[str] = None,
+    featured: Optional[bool] = None
+):
+    """Get portfolio projects, optionally filtered by category or featured flag"""
+    return await _serve(request, "projects", category=category, featured=featured)
+
+@router.get("/skills", response_model=List[Skill])
+async def get_skills(request: Request, category: Optional[str] = None):
+    """Get skills, optionally filtered by category"""
+    return await _serve(request, "skills", category=category)
+
+@router.get("/experiences", response_model=List[Experience])
+async def get_experiences(request: Request):
+    """Get work experience entries"""
+    return await _serve(request, "experiences")
+
+@router.get("/social-links", response_model=List[SocialLink])
+async def get_social_links(request: Request):
+    """Get social profile links"""
+    return await _serve(request, "socialLinks")
+
+@router.put("/content/{kind}", dependencies=[Depends(require_admin)])
+async def replace_content(kind: str, items: List[Dict[str, Any]] = Body(...)):
+    """Replace all items of one content kind (admin endpoint)"""
+    model = CONTENT_MODELS.get(kind)
+    if model is None:
+        raise HTTPException(status_code=404, detail="Unknown content kind")
+
+    try:
+        validated = [model.model_validate(item) for item in items]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        await content_service.replace(kind, validated)
+    except Exception as e:
+        logger.error(f"Replace {kind} error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    return {"message": "Content updated successfully", "kind": kind, "count": len(validated)}
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import FileResponse
+import logging
+
+from services.attachment_gc import attachment_gc
+from utils.admin_auth import require_admin
+from utils.loop_monitor import loop_monitor
+from utils.profiling import profiler
+
+logger = logging.getLogger(__name__)
+
+# Every maintenance endpoint is admin-only (X-Admin-Token header)
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.post("/maintenance/attachments/gc")
+async def run_attachment_gc():
+    """Quarantine and reclaim uploads that no contact message references"""
+    if attachment_gc.running:
+        raise HTTPException(status_code=409, detail="Attachment GC is already running")
+
+    try:
+        return await attachment_gc.run()
+    except Exception as e:
+        logger.error(f"Attachment GC error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/maintenance/profiles/{filename}")
+async def download_profile(filename: str):
+    """Download a collapsed-stack profile named in an X-Profile-File header"""
+    path = profiler.store.path_for(filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain; charset=utf-8", filename=filename)
+
+@router.get("/maintenance/loop-lag")
+async def get_loop_lag():
+    """Event-loop lag percentiles and the call sites that blocked the loop the longest"""
+    return loop_monitor.report()
@@ -1,11 +1,38 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+import asyncio
 import logging
+import os
+import time
 from pathlib import Path
 
 # Import database and routes
-from database import db, close_db_connection
+from database import db, close_db_connection, ensure_indexes, warm_connection_pool
 from routes.contact import router as contact_router
+from routes.maintenance import router as maintenance_router
+from routes.content import router as content_router
+from services.attachment_gc import attachment_gc
+from services.notification_digest import notification_digest
+from services.spam_filter import spam_filter
+from services.content_service import content_service
+from services.change_feed import contact_change_feed
+from services.email_service import email_service, warm_templates
+from services.lifecycle import lifecycle
+from utils.file_handler import file_handler
+from middleware.cache_control import CacheControlMiddleware
+from middleware.compression import CompressionMiddleware
+from middleware.body_limit import BodySizeLimitMiddleware
+from middleware.tenant import TenantMiddleware
+from middleware.lifecycle import DrainMiddleware
+from services.tenants import tenant_registry
+from utils.http_cache import compute_etag, etag_matches, not_modified
+from utils.logging_config import configure_logging
+from utils.metrics import metrics
+from utils.tracing import TracingMiddleware, create_exporter, tracing_enabled
+from utils.profiling import ProfilingMiddleware, profiler
+from utils.loop_monitor import loop_monitor
+from models.content import CONTENT_MODELS
 
 # Create the main app without a prefix
 app = FastAPI(
@@ -19,16 +46,47 @@ api_router = APIRouter(prefix="/api")
 
 # Add contact routes
 api_router.include_router(contact_router, tags=["contact"])
+api_router.include_router(maintenance_router, tags=["maintenance"])
+api_router.include_router(content_router, tags=["content"])
+
+# Cache-Control policy per (method, path)
+CACHE_POLICIES = {
+    ("GET", "/api/"): "public, max-age=300",
+    ("GET", "/api/health"): "no-store",
+    ("GET", "/api/ready"): "no-store",
+    ("GET", "/api/metrics"): "no-store",
+    ("GET", "/api/maintenance/loop-lag"): "no-store",
+    ("GET", "/api/contact"): "private, no-cache",
+    ("GET", "/api/projects"): "public, max-age=60, stale-while-revalidate=600",
+    ("GET", "/api/skills"): "public, max-age=60, stale-while-revalidate=600",
+    ("GET", "/api/experiences"): "public, max-age=60, stale-while-revalidate=600",
+    ("GET", "/api/social-links"): "public, max-age=60, stale-while-revalidate=600",
+}
+
+ROOT_ETAG = compute_etag("root", app.version)
 
 # Health check endpoint
 @api_router.get("/")
-async def root():
-    return {"message": "Portfolio API is running", "version": "1.0.0"}
+async def root(request: Request):
+    if etag_matches(request, ROOT_ETAG):
+        return not_modified(ROOT_ETAG)
+    return JSONResponse({"message": "Portfolio API is running", "version": "1.0.0"}, headers={"ETag": ROOT_ETAG})
 
 @api_router.get("/health")
 async def health_check():
     return {"status": "healthy", "database": "connected"}
 
+@api_router.get("/ready")
+async def readiness_check():
+    """Readiness probe: green once startup warm-up is done, red again while draining"""
+    if not lifecycle.ready:
+        return JSONResponse({"status": lifecycle.state}, status_code=503)
+    return {"status": lifecycle.state}
+
+@api_router.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -39,18 +97,121 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+app.add_middleware(CacheControlMiddleware, policies=CACHE_POLICIES)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv('COMPRESSION_MIN_SIZE', '1024')),
+    thread_size=int(os.getenv('COMPRESSION_THREAD_SIZE', str(256 * 1024)))
+)
+
+# Reject oversized bodies before multipart parsing spools them
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={
+        ("POST", "/api/contact"): file_handler.max_file_size + int(os.getenv('CONTACT_FORM_OVERHEAD_BYTES', str(64 * 1024))),
+    },
+    default_limit=int(os.getenv('MAX_REQUEST_BODY_BYTES', str(1024 * 1024)))
 )
+
+# Per-request phase timings (Server-Timing header, optional OTLP export)
+trace_exporter = None
+if tracing_enabled():
+    trace_exporter = create_exporter()
+    app.add_middleware(TracingMiddleware, exporter=trace_exporter)
+
+# On-demand (token) and 1-in-N sampled request profiling into a rotating directory
+if profiler.enabled:
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+# Count in-flight requests and refuse new ones once shutdown starts
+app.add_middleware(DrainMiddleware, lifecycle=lifecycle, always_allow=("/api/health", "/api/ready"))
+
+# Resolve the tenant (Host header or /t/<tenant-id> prefix) before anything path-based runs
+app.add_middleware(TenantMiddleware)
+
+# Configure logging: records are queued and written by a background thread
+log_listener = configure_logging()
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def startup_tasks():
+    # Started first so stalls during startup and warm-up are reported too
+    loop_monitor.start()
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        logger.error(f"Failed to ensure indexes: {str(e)}")
+    try:
+        await tenant_registry.load()
+    except Exception as e:
+        logger.error(f"Failed to load tenant config: {str(e)}")
+    await spam_filter.load()
+    try:
+        await content_service.seed()
+    except Exception as e:
+        logger.error(f"Failed to seed portfolio content: {str(e)}")
+    attachment_gc.start()
+    await warm_up()
+    lifecycle.on_drain(contact_change_feed.close_subscribers)
+    lifecycle.install_signal_handlers()
+    lifecycle.mark_ready()
+
+async def warm_up():
+    """Open pooled connections and build caches before readiness turns green"""
+    try:
+        await warm_connection_pool(int(os.getenv('MONGO_WARM_CONNECTIONS', '4')))
+    except Exception as e:
+        logger.error(f"Failed to warm MongoDB connection pool: {str(e)}")
+    warm_templates()
+    try:
+        for kind in CONTENT_MODELS:
+            await content_service.get(kind)
+    except Exception as e:
+        logger.error(f"Failed to warm content cache: {str(e)}")
+    if os.getenv('SMTP_WARMUP_ENABLED', 'true').lower() in ('1', 'true', 'yes'):
+        try:
+            # The timeout is enforced inside the worker thread, so it never outlives the warm-up
+            await asyncio.to_thread(email_service.warm_up, float(os.getenv('SMTP_WARMUP_TIMEOUT_SECONDS', '10')))
+        except Exception as e:
+            logger.warning(f"SMTP warm-up failed, first email will connect on demand: {str(e)!r}")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    # Runs after uvicorn's graceful wait for open requests (--timeout-graceful-shutdown);
+    # SIGTERM already flipped readiness and the drain middleware, so what is left to
+    # drain here is mostly tracked background tasks. The digest flush and SMTP close
+    # only get what is left of the drain deadline, so the hook as a whole stays within
+    # SHUTDOWN_DRAIN_SECONDS.
+    deadline = time.monotonic() + lifecycle.drain_seconds
+    drain_report = await lifecycle.drain()
+    await attachment_gc.stop()
+    await loop_monitor.stop()
+    await contact_change_feed.stop()
+    try:
+        await asyncio.wait_for(notification_digest.flush(deadline), timeout=max(deadline - time.monotonic(), 0))
+    except asyncio.TimeoutError:
+        logger.warning("Shutdown deadline passed while sending notification digests")
+    if notification_digest.pending_count:
+        logger.warning(f"Dropped {notification_digest.pending_count} queued owner notifications that could not be sent")
+    remaining = max(deadline - time.monotonic(), 0)
+    await asyncio.gather(
+        asyncio.to_thread(email_service.close, remaining),
+        tenant_registry.close_email_services(remaining)
+    )
+    logger.info(
+        "Shutdown complete: %d requests dropped, %d background tasks cancelled, %d notifications unsent",
+        drain_report["requests_dropped"], len(drain_report["tasks_cancelled"]), notification_digest.pending_count
+    )
     await close_db_connection()
+    dropped = metrics.snapshot()["counters"].get("log_records_dropped", 0)
+    if dropped:
+        logger.warning(f"Dropped {dropped} log records because the log queue was full")
+    if trace_exporter is not None:
+        trace_exporter.shutdown()
+    log_listener.stop()
 
 # Create uploads directory
 uploads_dir = Path("/app/backend/uploads")
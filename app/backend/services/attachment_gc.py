@@ -0,0 +1,222 @@
+import asyncio
+import os
+import time
+import logging
+from typing import Iterator, List, Optional, Set, Tuple
+
+from database import db
+from utils.file_handler import file_handler
+
+logger = logging.getLogger(__name__)
+
+QUARANTINE_DIRNAME = ".quarantine"
+# Every tenant's copy is named <collection_prefix>contact_messages
+MESSAGES_COLLECTION = "contact_messages"
+
+class AttachmentGarbageCollector:
+    """Finds uploads that no contact message references and reclaims them.
+
+    Files are streamed out of the uploads directory in fixed-size batches and
+    each batch is matched against a projected ``attachment_path`` cursor, so
+    memory stays bounded no matter how many files the directory holds.
+    Orphans older than the grace period are first moved to a quarantine
+    directory and only removed once they have sat there for the retention
+    period; a quarantined file that becomes referenced again is restored.
+
+    References are checked against every contact message collection found
+    in the database, not the cached tenant config, so a tenant whose config
+    failed to load still keeps its files.
+    """
+
+    def __init__(self, upload_dir: Optional[str] = None):
+        self.upload_dir = upload_dir or file_handler.upload_dir
+        self.quarantine_dir = os.path.join(self.upload_dir, QUARANTINE_DIRNAME)
+        self.batch_size = int(os.getenv('ATTACHMENT_GC_BATCH_SIZE', '500'))
+        self.grace_period = int(os.getenv('ATTACHMENT_GC_GRACE_SECONDS', str(24 * 3600)))
+        self.quarantine_retention = int(os.getenv('ATTACHMENT_GC_QUARANTINE_SECONDS', str(7 * 24 * 3600)))
+        self.interval = int(os.getenv('ATTACHMENT_GC_INTERVAL_SECONDS', '0'))
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    async def run(self) -> dict:
+        """Run one full collection pass and return a report"""
+        async with self._lock:
+            started = time.monotonic()
+            report = {
+                "scanned": 0,
+                "quarantined": 0,
+                "restored": 0,
+                "removed": 0,
+                "reclaimed_bytes": 0,
+                "errors": 0,
+            }
+            collections = await self._message_collections()
+            await self._quarantine_orphans(report, collections)
+            await self._sweep_quarantine(report, collections)
+            report["duration_seconds"] = round(time.monotonic() - started, 3)
+
+            logger.info(
+                "Attachment GC finished: scanned=%d quarantined=%d restored=%d removed=%d reclaimed_bytes=%d errors=%d",
+                report["scanned"], report["quarantined"], report["restored"],
+                report["removed"], report["reclaimed_bytes"], report["errors"]
+            )
+            return report
+
+    async def _quarantine_orphans(self, report: dict, collections: List[str]):
+        batches = self._scan_batches(self.upload_dir, min_age=self.grace_period)
+        while True:
+            batch = await asyncio.to_thread(next, batches, None)
+            if batch is None:
+                break
+            report["scanned"] += len(batch)
+
+            referenced = await self._referenced_paths(collections, [path for path, _, _ in batch])
+            orphans = [path for path, _, _ in batch if path not in referenced]
+            if orphans:
+                moved, errors = await asyncio.to_thread(self._move_to_quarantine, orphans)
+                report["quarantined"] += moved
+                report["errors"] += errors
+
+    async def _sweep_quarantine(self, report: dict, collections: List[str]):
+        if not os.path.isdir(self.quarantine_dir):
+            return
+
+        batches = self._scan_batches(self.quarantine_dir, min_age=0)
+        now = time.time()
+        while True:
+            batch = await asyncio.to_thread(next, batches, None)
+            if batch is None:
+                break
+
+            originals = {path: os.path.join(self.upload_dir, os.path.basename(path)) for path, _, _ in batch}
+            referenced = await self._referenced_paths(collections, list(originals.values()))
+
+            to_restore = [path for path, _, _ in batch if originals[path] in referenced]
+            expired = [
+                (path, size) for path, size, mtime in batch
+                if originals[path] not in referenced and now - mtime >= self.quarantine_retention
+            ]
+
+            if to_restore:
+                restored, errors = await asyncio.to_thread(self._restore, to_restore)
+                report["restored"] += restored
+                report["errors"] += errors
+            if expired:
+                removed, reclaimed, errors = await asyncio.to_thread(self._remove, expired)
+                report["removed"] += removed
+                report["reclaimed_bytes"] += reclaimed
+                report["errors"] += errors
+
+    async def _message_collections(self) -> List[str]:
+        """Names of all tenants' contact message collections; raises rather than guess if listing fails"""
+        names = await db.list_collection_names()
+        return [name for name in names if name.endswith(MESSAGES_COLLECTION)]
+
+    async def _referenced_paths(self, collections: List[str], paths: List[str]) -> Set[str]:
+        """Return the subset of ``paths`` that some tenant's contact message still points at"""
+        referenced = set()
+        for name in collections:
+            cursor = db[name].find(
+                {"attachment_path": {"$in": paths}},
+                {"attachment_path": 1, "_id": 0}
+            ).batch_size(self.batch_size)
+            referenced.update([doc["attachment_path"] async for doc in cursor])
+        return referenced
+
+    def _scan_batches(self, directory: str, min_age: int) -> Iterator[List[Tuple[str, int, float]]]:
+        """Yield (path, size, mtime) batches of regular files older than ``min_age`` seconds"""
+        if not os.path.isdir(directory):
+            return
+
+        cutoff = time.time() - min_age
+        batch = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                try:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if stat.st_mtime > cutoff:
+                    continue
+
+                batch.append((entry.path, stat.st_size, stat.st_mtime))
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    def _move_to_quarantine(self, paths: List[str]) -> Tuple[int, int]:
+        os.makedirs(self.quarantine_dir, exist_ok=True)
+        moved = errors = 0
+        for path in paths:
+            target = os.path.join(self.quarantine_dir, os.path.basename(path))
+            try:
+                os.replace(path, target)
+                # Retention is measured from the time the file entered quarantine
+                os.utime(target)
+                moved += 1
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.error(f"Failed to quarantine {path}: {str(e)}")
+                errors += 1
+        return moved, errors
+
+    def _restore(self, paths: List[str]) -> Tuple[int, int]:
+        restored = errors = 0
+        for path in paths:
+            try:
+                os.replace(path, os.path.join(self.upload_dir, os.path.basename(path)))
+                restored += 1
+            except OSError as e:
+                logger.error(f"Failed to restore quarantined file {path}: {str(e)}")
+                errors += 1
+        return restored, errors
+
+    def _remove(self, entries: List[Tuple[str, int]]) -> Tuple[int, int, int]:
+        removed = reclaimed = errors = 0
+        for path, size in entries:
+            try:
+                os.remove(path)
+                removed += 1
+                reclaimed += size
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.error(f"Failed to remove quarantined file {path}: {str(e)}")
+                errors += 1
+        return removed, reclaimed, errors
+
+    def start(self):
+        """Start the periodic collection loop if an interval is configured"""
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._periodic())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _periodic(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run()
+            except Exception as e:
+                logger.error(f"Attachment GC run failed: {str(e)}")
+
+# Create global instance
+attachment_gc = AttachmentGarbageCollector()
@@ -0,0 +1,97 @@
+import os
+import time
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Tuple
+
+from pymongo.errors import DuplicateKeyError
+
+from services.tenants import current_tenant, tenant_collection
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SUPPRESSION_COLLECTION = "auto_reply_suppression"
+
+def normalize_address(email: str) -> str:
+    """Lower-cased address with any +tag removed, so variants of one inbox share a window"""
+    local, _, domain = email.strip().lower().rpartition("@")
+    return f"{local.split('+', 1)[0]}@{domain}" if local else domain
+
+class AutoReplySuppressor:
+    """Lets only the first submission per recipient within ``window_seconds`` trigger an auto-reply.
+
+    Recent recipients are remembered in a bounded in-memory TTL map, so
+    repeat submissions to the same worker are suppressed without a query.
+    The authoritative record is a per-tenant collection with a TTL index on
+    ``expires_at``; a window is claimed with a conditional upsert keyed by
+    the normalized address, which is atomic across workers.
+    """
+
+    def __init__(self):
+        self.window_seconds = int(os.getenv('AUTO_REPLY_SUPPRESSION_SECONDS', '3600'))
+        self.max_entries = int(os.getenv('AUTO_REPLY_SUPPRESSION_MAX_ENTRIES', '10000'))
+        # (tenant id, address) -> wall-clock expiry, oldest first
+        self._recent: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_seconds > 0
+
+    async def should_send(self, email: str) -> bool:
+        """Claim the auto-reply window for ``email``; False when one was already sent within it"""
+        if not self.enabled:
+            return True
+
+        address = normalize_address(email)
+        key = (current_tenant().id, address)
+        now = time.time()
+        expires_at = self._recent.get(key)
+        if expires_at is not None:
+            if expires_at > now:
+                metrics.incr("auto_replies_suppressed")
+                return False
+            del self._recent[key]
+
+        collection = tenant_collection(SUPPRESSION_COLLECTION)
+        claimed_until = datetime.utcnow() + timedelta(seconds=self.window_seconds)
+        try:
+            await collection.update_one(
+                {"_id": address, "expires_at": {"$lte": datetime.utcnow()}},
+                {"$set": {"expires_at": claimed_until}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Another submission holds the window: remember when it ends
+            document = await collection.find_one({"_id": address}, {"expires_at": 1})
+            if document is not None:
+                self._remember(key, now + max((document["expires_at"] - datetime.utcnow()).total_seconds(), 0))
+            metrics.incr("auto_replies_suppressed")
+            return False
+        except Exception as e:
+            # Fail open: a missed suppression costs one extra email, a missed auto-reply is worse
+            logger.error(f"Auto-reply suppression lookup failed: {str(e)}")
+
+        self._remember(key, now + self.window_seconds)
+        return True
+
+    async def release(self, email: str):
+        """Give back a window claimed by should_send() when no auto-reply went out"""
+        if not self.enabled:
+            return
+        address = normalize_address(email)
+        self._recent.pop((current_tenant().id, address), None)
+        try:
+            await tenant_collection(SUPPRESSION_COLLECTION).delete_one({"_id": address})
+        except Exception as e:
+            logger.error(f"Failed to release auto-reply suppression window: {str(e)}")
+
+    def _remember(self, key: Tuple[str, str], expires_at: float):
+        self._recent[key] = expires_at
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.max_entries:
+            self._recent.popitem(last=False)
+
+# Create global instance
+auto_reply_suppressor = AutoReplySuppressor()
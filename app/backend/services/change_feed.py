@@ -0,0 +1,231 @@
+import asyncio
+import os
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from pymongo.errors import OperationFailure
+
+from database import db
+from services.tenants import current_tenant, tenant_registry
+from utils.metrics import metrics
+from utils.serialization import admin_contact, dumps
+
+logger = logging.getLogger(__name__)
+
+# Sentinel pushed to a subscriber that fell too far behind
+OVERFLOW = object()
+# "$changeStream is only supported on replica sets"
+CHANGE_STREAMS_UNSUPPORTED = 40573
+
+@dataclass(eq=False)
+class Subscriber:
+    """One connected client: the tenant it watches and its bounded frame queue"""
+    tenant_id: str
+    queue: asyncio.Queue = field(repr=False)
+
+class ContactChangeFeed:
+    """Fans one change stream over every tenant's contact_messages out to connected clients.
+
+    A single watcher task per process follows a database-level change stream
+    filtered to the contact collections, tags each event with the owning
+    tenant and pushes it to that tenant's bounded subscriber queues. The most
+    recent events are kept in a ring buffer keyed by resume token so a
+    reconnecting client can replay what it missed; the watcher itself resumes
+    from the last token after errors.
+
+    Replay only covers this process's ring buffer: after a restart, or when
+    the client reconnects to another worker, its last event id is unknown
+    and it is told to resync from GET /api/contact instead.
+
+    Change streams need a replica set. On a standalone server the watcher
+    notices once and polls for new submissions by ``submitted_at`` instead;
+    status changes are not streamed in that mode.
+    """
+
+    def __init__(self):
+        self.buffer_size = int(os.getenv('CHANGE_FEED_BUFFER_SIZE', '1000'))
+        self.subscriber_queue_size = int(os.getenv('CHANGE_FEED_SUBSCRIBER_QUEUE_SIZE', '100'))
+        self.heartbeat_seconds = float(os.getenv('CHANGE_FEED_HEARTBEAT_SECONDS', '15'))
+        self.poll_seconds = float(os.getenv('CHANGE_FEED_POLL_SECONDS', '2'))
+        # submitted_at is set before the upload is stored, so look back past slow inserts
+        self.poll_lookback = timedelta(seconds=float(os.getenv('CHANGE_FEED_POLL_LOOKBACK_SECONDS', '60')))
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+        self._recent: Deque[Tuple[str, str, bytes]] = deque(maxlen=self.buffer_size)
+        self._resume_token: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Tuple[Subscriber, List[bytes], bool]:
+        """Register a subscriber for the current tenant's events.
+
+        Returns the subscriber, the buffered events after ``last_event_id`` and
+        whether the replay is complete (False when the id is no longer
+        buffered and the client has to resync from GET /api/contact).
+        """
+        self._ensure_started()
+        tenant_id = current_tenant().id
+        subscriber = Subscriber(tenant_id, asyncio.Queue(maxsize=self.subscriber_queue_size))
+        self._subscribers.setdefault(tenant_id, set()).add(subscriber)
+
+        if not last_event_id:
+            return subscriber, [], True
+        for index, (token, _, _) in enumerate(self._recent):
+            if token == last_event_id:
+                replay = [frame for _, owner, frame in list(self._recent)[index + 1:] if owner == tenant_id]
+                return subscriber, replay, True
+        return subscriber, [], False
+
+    def unsubscribe(self, subscriber: Subscriber):
+        subscribers = self._subscribers.get(subscriber.tenant_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[subscriber.tenant_id]
+
+    def close_subscribers(self):
+        """End every open stream; clients reconnect with their last event id"""
+        subscribers, self._subscribers = self._subscribers, {}
+        for subscriber in (subscriber for tenant_subscribers in subscribers.values() for subscriber in tenant_subscribers):
+            while not subscriber.queue.empty():
+                subscriber.queue.get_nowait()
+            subscriber.queue.put_nowait(OVERFLOW)
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self):
+        if await self._supports_change_streams():
+            await self._stream()
+        await self._poll()
+
+    async def _supports_change_streams(self) -> bool:
+        try:
+            hello = await db.client.admin.command("hello")
+        except Exception as e:
+            # Try the stream anyway; an unsupported server is still detected by its error code
+            logger.warning(f"Could not check MongoDB topology: {str(e)}")
+            return True
+        return "setName" in hello or hello.get("msg") == "isdbgrid"
+
+    async def _stream(self):
+        """Follow the change stream until the server turns out not to support one"""
+        pipeline = [{"$match": {
+            "operationType": {"$in": ["insert", "update", "replace"]},
+            "ns.coll": {"$regex": "contact_messages$"}
+        }}]
+        backoff = 1
+        while True:
+            try:
+                async with db.watch(
+                    pipeline,
+                    full_document="updateLookup",
+                    resume_after=self._resume_token
+                ) as stream:
+                    backoff = 1
+                    async for change in stream:
+                        self._resume_token = change["_id"]
+                        self._publish(change)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAMS_UNSUPPORTED:
+                    return
+                # ChangeStreamHistoryLost: the token fell off the oplog, start from now
+                if e.code == 286:
+                    self._resume_token = None
+                logger.error(f"Contact change stream error: {str(e)}")
+            except Exception as e:
+                logger.error(f"Contact change stream error: {str(e)}")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    async def _poll(self):
+        """Publish submissions found by polling every contact_messages collection"""
+        logger.warning(
+            "MongoDB is not a replica set: polling for new submissions every %gs, status changes are not streamed",
+            self.poll_seconds
+        )
+        since = datetime.utcnow()
+        seen: "OrderedDict[str, datetime]" = OrderedDict()
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                names = [name for name in await db.list_collection_names() if name.endswith("contact_messages")]
+                newest = since
+                for name in names:
+                    cursor = db[name].find(
+                        {"submitted_at": {"$gt": since - self.poll_lookback}}
+                    ).sort("submitted_at", 1).limit(self.buffer_size)
+                    async for document in cursor:
+                        newest = max(newest, document["submitted_at"])
+                        if document["id"] in seen:
+                            continue
+                        seen[document["id"]] = document["submitted_at"]
+                        self._publish({
+                            "_id": {"_data": f"poll-{document['id']}"},
+                            "operationType": "insert",
+                            "ns": {"coll": name},
+                            "fullDocument": document,
+                        })
+                since = newest
+                # Ids older than the lookback window can no longer come back from the query
+                while seen and next(iter(seen.values())) <= since - self.poll_lookback:
+                    seen.popitem(last=False)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Contact change poll error: {str(e)}")
+
+    def _publish(self, change: dict):
+        tenant = tenant_registry.for_collection(change.get("ns", {}).get("coll", ""), "contact_messages")
+        if tenant is None:
+            return
+        event = self._to_event(change)
+        if event is None:
+            return
+
+        token = change["_id"]["_data"]
+        event_type, data = event
+        frame = f"id: {token}\nevent: {event_type}\ndata: ".encode("utf-8") + dumps(data) + b"\n\n"
+        self._recent.append((token, tenant.id, frame))
+
+        for subscriber in list(self._subscribers.get(tenant.id, ())):
+            try:
+                subscriber.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Slow client: cut it loose, it will reconnect with its last event id
+                self.unsubscribe(subscriber)
+                subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait(OVERFLOW)
+
+    def _to_event(self, change: dict) -> Optional[Tuple[str, dict]]:
+        document = change.get("fullDocument")
+        if document is None:
+            return None
+        if change["operationType"] == "insert":
+            return "contact.created", admin_contact(document)
+
+        updated = change.get("updateDescription", {}).get("updatedFields", {})
+        if change["operationType"] == "replace" or "status" in updated:
+            return "contact.status", {"id": document.get("id"), "status": document.get("status")}
+        return None
+
+# Create global instance
+contact_change_feed = ContactChangeFeed()
+metrics.register_gauge("change_feed_subscribers", lambda: contact_change_feed.subscriber_count)
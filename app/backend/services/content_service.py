@@ -0,0 +1,180 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from middleware.compression import brotli, compress
+from models.tenant import Tenant, DEFAULT_TENANT_ID
+from services.tenants import current_tenant, tenant_collection, tenant_registry
+from utils.http_cache import bump_write_generation, get_write_generation
+from utils.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+CONTENT_COLLECTION = "portfolio_content"
+# kind -> revision of the items currently published for it
+REVISIONS_COLLECTION = "portfolio_content_revisions"
+SEED_PATH = Path(__file__).resolve().parent.parent / "data" / "portfolio_content.json"
+
+@dataclass(frozen=True)
+class ContentPayload:
+    """A content response serialized once, in every encoding we serve"""
+    body: bytes
+    gzip: bytes
+    br: Optional[bytes]
+    etag: str
+
+    def encoded(self, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        if encoding == "br" and self.br is not None:
+            return self.br, "br"
+        if encoding in ("br", "gzip"):
+            return self.gzip, "gzip"
+        return self.body, None
+
+class ContentService:
+    """Serves portfolio content from precomputed, pre-compressed payloads.
+
+    Each (kind, filters) combination is serialized and compressed the first
+    time it is requested and then served straight from memory. Each tenant
+    has its own content collection and cache entries; a tenant's entries are
+    dropped whenever its content write generation changes, which is checked
+    at most every ``version_check_interval`` seconds so other workers pick
+    up edits without a query per request.
+
+    Items are written under a new revision and published by flipping the
+    kind's revision pointer, so readers see either the old or the new set,
+    never a half-written or empty one. A tenant that has never published a
+    kind is served the default tenant's items for it.
+    """
+
+    def __init__(self):
+        self.version_check_interval = float(os.getenv('CONTENT_VERSION_CHECK_SECONDS', '5'))
+        self.max_cached_payloads = int(os.getenv('CONTENT_CACHE_MAX_ENTRIES', '256'))
+        self._cache: Dict[tuple, ContentPayload] = {}
+        self._generations: Dict[str, Optional[int]] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._build_lock = asyncio.Lock()
+
+    def collection(self, tenant: Optional[Tenant] = None):
+        return tenant_collection(CONTENT_COLLECTION, tenant)
+
+    def revisions(self, tenant: Optional[Tenant] = None):
+        return tenant_collection(REVISIONS_COLLECTION, tenant)
+
+    async def seed(self, tenant: Optional[Tenant] = None):
+        """Load the bundled content into a tenant's empty collection"""
+        collection = self.collection(tenant)
+        if await collection.estimated_document_count() > 0:
+            return
+
+        with open(SEED_PATH, encoding="utf-8") as f:
+            content = json.load(f)
+        for kind, items in content.items():
+            await self._publish(tenant or current_tenant(), kind, items)
+        await bump_write_generation(collection.name)
+        logger.info(f"Seeded {sum(len(items) for items in content.values())} portfolio content items")
+
+    async def get(self, kind: str, **filters) -> ContentPayload:
+        tenant_id = current_tenant().id
+        await self._check_generation(tenant_id)
+        filters = {name: value for name, value in filters.items() if value is not None}
+        key = (tenant_id, kind, tuple(sorted(filters.items())))
+
+        payload = self._cache.get(key)
+        if payload is not None:
+            return payload
+
+        async with self._build_lock:
+            payload = self._cache.get(key)
+            if payload is None:
+                payload = await self._build(kind, filters)
+                if len(self._cache) >= self.max_cached_payloads:
+                    self._cache.clear()
+                self._cache[key] = payload
+        return payload
+
+    async def replace(self, kind: str, items: List[BaseModel]):
+        """Replace every item of one content kind and invalidate cached payloads"""
+        tenant = current_tenant()
+        await self._publish(tenant, kind, [item.model_dump() for item in items])
+        await bump_write_generation(self.collection(tenant).name)
+        # Tenants falling back to the default content cache it under their own ids
+        for tenant_id in [tenant.id] if tenant.id != DEFAULT_TENANT_ID else list(self._checked_at):
+            self._drop_tenant(tenant_id)
+            self._checked_at.pop(tenant_id, None)
+
+    async def _publish(self, tenant: Tenant, kind: str, items: List[dict]):
+        """Write ``items`` under a new revision, point ``kind`` at it, then drop the revision it replaced"""
+        revision = uuid.uuid4().hex
+        collection = self.collection(tenant)
+        if items:
+            await collection.insert_many([
+                {"kind": kind, "revision": revision, "order": order, **item}
+                for order, item in enumerate(items)
+            ])
+        # Returns the pointer as it was before the flip; None for content written before revisions existed
+        previous = await self.revisions(tenant).find_one_and_update(
+            {"_id": kind}, {"$set": {"revision": revision}}, upsert=True
+        )
+        await collection.delete_many({"kind": kind, "revision": previous["revision"] if previous else None})
+
+    async def _source(self, kind: str) -> Tuple[Tenant, Optional[str]]:
+        """Tenant whose items are served for ``kind`` and the revision to read"""
+        tenant = current_tenant()
+        pointer = await self.revisions(tenant).find_one({"_id": kind})
+        if pointer is not None:
+            return tenant, pointer["revision"]
+        if tenant.id == DEFAULT_TENANT_ID or await self.collection(tenant).find_one({"kind": kind}, {"_id": 1}):
+            return tenant, None
+        default = tenant_registry.default
+        pointer = await self.revisions(default).find_one({"_id": kind})
+        return default, pointer["revision"] if pointer else None
+
+    async def _check_generation(self, tenant_id: str):
+        now = time.monotonic()
+        if now - self._checked_at.get(tenant_id, 0.0) < self.version_check_interval:
+            return
+        self._checked_at[tenant_id] = now
+
+        generation = await get_write_generation(self.collection().name)
+        if tenant_id != DEFAULT_TENANT_ID:
+            # Kinds served from the default tenant change with its content too
+            generation = (generation, await get_write_generation(self.collection(tenant_registry.default).name))
+        if generation != self._generations.get(tenant_id):
+            self._drop_tenant(tenant_id)
+            self._generations[tenant_id] = generation
+
+    def _drop_tenant(self, tenant_id: str):
+        for key in [key for key in self._cache if key[0] == tenant_id]:
+            del self._cache[key]
+
+    async def _build(self, kind: str, filters: dict) -> ContentPayload:
+        tenant, revision = await self._source(kind)
+        cursor = self.collection(tenant).find(
+            {"kind": kind, "revision": revision, **filters},
+            {"_id": 0, "kind": 0, "revision": 0, "order": 0}
+        ).sort("order", 1)
+        items = await cursor.to_list(length=None)
+        # Encoded once per content change, so maximum compression pays off; brotli 11
+        # takes long enough on large bodies that it must not run on the event loop
+        return await asyncio.to_thread(self._encode, items)
+
+    def _encode(self, items: List[dict]) -> ContentPayload:
+        body = dumps(items)
+        return ContentPayload(
+            body=body,
+            gzip=compress(body, "gzip", gzip_level=9),
+            br=compress(body, "br", brotli_quality=11) if brotli is not None else None,
+            etag=f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        )
+
+# Create global instance
+content_service = ContentService()
@@ -1,16 +1,226 @@
+import base64
+import copy
+import re
+import secrets
 import smtplib
 import ssl
+import threading
+import time
+from contextlib import contextmanager
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
-from email import encoders
+from email.policy import SMTP as SMTP_POLICY
 import os
-from typing import Optional
+from typing import Dict, Iterator, List, Optional
 import logging
 from jinja2 import Template
 
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError, get_breaker
+from utils.file_handler import file_handler
+
 logger = logging.getLogger(__name__)
 
+# 57 raw bytes encode to one 76-character base64 line; read whole lines at a time
+BASE64_LINE_BYTES = 57
+BASE64_BLOCK_BYTES = BASE64_LINE_BYTES * 1024
+_LEADING_DOT_RE = re.compile(rb"^\.", re.MULTILINE)
+# Refusals of one message by a responsive server; these do not count against the circuit
+SMTP_REJECTIONS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+def iter_base64_lines(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Incrementally base64-encode a byte stream into CRLF-terminated 76-character lines"""
+    pending = b""
+    for chunk in chunks:
+        pending += chunk
+        usable = len(pending) - len(pending) % BASE64_LINE_BYTES
+        if usable < BASE64_BLOCK_BYTES:
+            continue
+        yield _encode_lines(pending[:usable])
+        pending = pending[usable:]
+    if pending:
+        yield _encode_lines(pending)
+
+def _encode_lines(data: bytes) -> bytes:
+    encoded = base64.b64encode(data)
+    return b"".join(encoded[i:i + 76] + b"\r\n" for i in range(0, len(encoded), 76))
+
+CONTACT_NOTIFICATION_TEMPLATE = """
+<html>
+<head>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 8px 8px 0 0; }
+        .content { background: #f8f9fa; padding: 20px; border-radius: 0 0 8px 8px; }
+        .field { margin-bottom: 15px; }
+        .label { font-weight: bold; color: #555; }
+        .value { background: white; padding: 10px; border-radius: 4px; border-left: 4px solid #667eea; }
+        .message-box { background: white; padding: 15px; border-radius: 4px; border-left: 4px solid #28a745; }
+        .footer { margin-top: 20px; font-size: 12px; color: #666; text-align: center; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h2>🚀 New Contact Form Submission</h2>
+            <p>You have received a new message from your portfolio website.</p>
+        </div>
+        <div class="content">
+            <div class="field">
+                <div class="label">Name:</div>
+                <div class="value">{{ name }}</div>
+            </div>
+            <div class="field">
+                <div class="label">Email:</div>
+                <div class="value">{{ email }}</div>
+            </div>
+            <div class="field">
+                <div class="label">Subject:</div>
+                <div class="value">{{ subject }}</div>
+            </div>
+            {% if phone %}
+            <div class="field">
+                <div class="label">Phone:</div>
+                <div class="value">{{ phone }}</div>
+            </div>
+            {% endif %}
+            {% if company %}
+            <div class="field">
+                <div class="label">Company:</div>
+                <div class="value">{{ company }}</div>
+            </div>
+            {% endif %}
+            <div class="field">
+                <div class="label">Message:</div>
+                <div class="message-box">{{ message }}</div>
+            </div>
+            {% if has_attachment %}
+            <div class="field">
+                <div class="label">Attachment:</div>
+                <div class="value">📎 {{ attachment_filename }}
+                {% if attachment_link %}<br><a href="{{ attachment_link }}">Download ({{ attachment_size_label }})</a> — too large to attach, the link expires{% endif %}</div>
+            </div>
+            {% endif %}
+            <div class="field">
+                <div class="label">Submitted At:</div>
+                <div class="value">{{ submitted_at }}</div>
+            </div>
+        </div>
+        <div class="footer">
+            <p>This email was sent from your portfolio contact form.</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+CONTACT_DIGEST_TEMPLATE = """
+<html>
+<head>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 8px 8px 0 0; }
+        .content { background: #f8f9fa; padding: 20px; border-radius: 0 0 8px 8px; }
+        .entry { background: white; padding: 15px; border-radius: 4px; border-left: 4px solid #667eea; margin-bottom: 15px; }
+        .meta { font-size: 13px; color: #555; }
+        .message-box { margin-top: 8px; border-left: 4px solid #28a745; padding-left: 10px; }
+        .footer { margin-top: 20px; font-size: 12px; color: #666; text-align: center; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h2>📬 {{ contacts|length }} New Contact Form Submission{% if contacts|length != 1 %}s{% endif %}</h2>
+            <p>{{ first_submitted_at }} – {{ last_submitted_at }}</p>
+        </div>
+        <div class="content">
+            {% for contact in contacts %}
+            <div class="entry">
+                <strong>{{ contact.subject }}</strong>
+                <div class="meta">
+                    {{ contact.name }} &lt;{{ contact.email }}&gt;
+                    {% if contact.company %} · {{ contact.company }}{% endif %}
+                    {% if contact.phone %} · {{ contact.phone }}{% endif %}
+                    · {{ contact.submitted_at }}
+                </div>
+                <div class="message-box">{{ contact.message }}</div>
+            </div>
+            {% endfor %}
+        </div>
+        <div class="footer">
+            <p>This digest was sent from your portfolio contact form.</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+AUTO_REPLY_TEMPLATE = """
+<html>
+<head>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 8px 8px 0 0; }
+        .content { background: #f8f9fa; padding: 20px; border-radius: 0 0 8px 8px; }
+        .message-box { background: white; padding: 15px; border-radius: 4px; border-left: 4px solid #28a745; }
+        .footer { margin-top: 20px; font-size: 12px; color: #666; text-align: center; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h2>👋 Thank you for reaching out!</h2>
+        </div>
+        <div class="content">
+            <p>Hi {{ name }},</p>
+            <p>Thank you for contacting me through my portfolio website. I have received your message and will get back to you as soon as possible.</p>
+            
+            <div class="message-box">
+                <h4>Your Message:</h4>
+                <p><strong>Subject:</strong> {{ subject }}</p>
+                <p><strong>Message:</strong> {{ message }}</p>
+            </div>
+            
+            <p>I typically respond within 24-48 hours. In the meantime, feel free to:</p>
+            <ul>
+                <li>Check out my latest projects on <a href="https://github.com/shubham-kadam">GitHub</a></li>
+                <li>Connect with me on <a href="https://linkedin.com/in/shubham-kadam">LinkedIn</a></li>
+                <li>View my data science work on <a href="https://kaggle.com/shubhamkadam">Kaggle</a></li>
+            </ul>
+            
+            <p>Best regards,<br>
+            <strong>Shubham Kadam</strong><br>
+            Data Analyst & Developer</p>
+        </div>
+        <div class="footer">
+            <p>This is an automated response. Please do not reply to this email.</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+TEMPLATE_SOURCES = {
+    "contact_notification": CONTACT_NOTIFICATION_TEMPLATE,
+    "contact_digest": CONTACT_DIGEST_TEMPLATE,
+    "auto_reply": AUTO_REPLY_TEMPLATE,
+}
+_compiled_templates: Dict[str, Template] = {}
+
+def get_template(name: str) -> Template:
+    """Compiled email template, compiled once per process"""
+    template = _compiled_templates.get(name)
+    if template is None:
+        template = _compiled_templates[name] = Template(TEMPLATE_SOURCES[name])
+    return template
+
+def warm_templates():
+    for name in TEMPLATE_SOURCES:
+        get_template(name)
+
 class EmailService:
     def __init__(self):
         self.smtp_host = os.getenv('SMTP_HOST', 'smtp.gmail.com')
@@ -20,6 +230,56 @@ class EmailService:
         self.from_email = os.getenv('FROM_EMAIL', 'noreply@shubhamkadam.dev')
         self.from_name = os.getenv('FROM_NAME', 'Shubham Kadam Portfolio')
         self.to_email = os.getenv('TO_EMAIL', 'shubham.kadam@email.com')
+        # Larger uploads are linked from the owner notification instead of attached
+        self.max_attachment_bytes = int(os.getenv('EMAIL_MAX_ATTACHMENT_BYTES', str(3 * 1024 * 1024)))
+        # Per socket operation (connect, then each command or chunk sent) and per email overall
+        self.connect_timeout = float(os.getenv('SMTP_CONNECT_TIMEOUT_SECONDS', '10'))
+        self.send_timeout = float(os.getenv('SMTP_SEND_TIMEOUT_SECONDS', '30'))
+        self.total_timeout = float(os.getenv('SMTP_TOTAL_TIMEOUT_SECONDS', '60'))
+        self._ssl_context = ssl.create_default_context()
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_lock = threading.Lock()
+        self.circuit = self._create_circuit()
+
+    def _create_circuit(self) -> CircuitBreaker:
+        # One breaker per SMTP server, shared by every service (and tenant) that sends through it
+        return get_breaker(
+            f"smtp_{self.smtp_host}:{self.smtp_port}",
+            failure_rate_threshold=float(os.getenv('SMTP_CIRCUIT_FAILURE_RATE', '0.5')),
+            minimum_calls=int(os.getenv('SMTP_CIRCUIT_MINIMUM_CALLS', '4')),
+            window_size=int(os.getenv('SMTP_CIRCUIT_WINDOW', '20')),
+            open_seconds=float(os.getenv('SMTP_CIRCUIT_OPEN_SECONDS', '60'))
+        )
+    
+    def with_overrides(self, **settings) -> "EmailService":
+        """Copy of this service with some SMTP or address settings replaced"""
+        service = copy.copy(self)
+        for name, value in settings.items():
+            setattr(service, name, value)
+        # The copy talks to its own SMTP server, so it gets its own session
+        service._smtp = None
+        service._smtp_lock = threading.Lock()
+        service.circuit = service._create_circuit()
+        return service
+    
+    def warm_up(self, timeout: Optional[float] = None):
+        """Open and authenticate the SMTP session ahead of the first send.
+
+        Bounded by ``timeout`` (default: the per-email total) so the session
+        lock is released by the time a caller stops waiting.
+        """
+        with self._session(time.monotonic() + (self.total_timeout if timeout is None else timeout)):
+            pass
+    
+    def close(self, timeout: Optional[float] = None):
+        # A send still holding the session is bounded by its own deadline; don't wait past it
+        if not self._smtp_lock.acquire(timeout=self.total_timeout if timeout is None else max(timeout, 0)):
+            logger.warning("SMTP session still busy at shutdown, leaving it to be closed with the process")
+            return
+        try:
+            self._close_session()
+        finally:
+            self._smtp_lock.release()
         
     def send_contact_form_notification(self, contact_data: dict) -> bool:
         """Send notification email when contact form is submitted"""
@@ -27,77 +287,22 @@ class EmailService:
             # Create email content
             subject = f"New Contact Form Submission: {contact_data['subject']}"
             
-            html_template = """
-            <html>
-            <head>
-                <style>
-                    body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
-                    .container { max-width: 600px; margin: 0 auto; padding: 20px; }
-                    .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 8px 8px 0 0; }
-                    .content { background: #f8f9fa; padding: 20px; border-radius: 0 0 8px 8px; }
-                    .field { margin-bottom: 15px; }
-                    .label { font-weight: bold; color: #555; }
-                    .value { background: white; padding: 10px; border-radius: 4px; border-left: 4px solid #667eea; }
-                    .message-box { background: white; padding: 15px; border-radius: 4px; border-left: 4px solid #28a745; }
-                    .footer { margin-top: 20px; font-size: 12px; color: #666; text-align: center; }
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h2>🚀 New Contact Form Submission</h2>
-                        <p>You have received a new message from your portfolio website.</p>
-                    </div>
-                    <div class="content">
-                        <div class="field">
-                            <div class="label">Name:</div>
-                            <div class="value">{{ name }}</div>
-                        </div>
-                        <div class="field">
-                            <div class="label">Email:</div>
-                            <div class="value">{{ email }}</div>
-                        </div>
-                        <div class="field">
-                            <div class="label">Subject:</div>
-                            <div class="value">{{ subject }}</div>
-                        </div>
-                        {% if phone %}
-                        <div class="field">
-                            <div class="label">Phone:</div>
-                            <div class="value">{{ phone }}</div>
-                        </div>
-                        {% endif %}
-                        {% if company %}
-                        <div class="field">
-                            <div class="label">Company:</div>
-                            <div class="value">{{ company }}</div>
-                        </div>
-                        {% endif %}
-                        <div class="field">
-                            <div class="label">Message:</div>
-                            <div class="message-box">{{ message }}</div>
-                        </div>
-                        {% if has_attachment %}
-                        <div class="field">
-                            <div class="label">Attachment:</div>
-                            <div class="value">📎 {{ attachment_filename }}</div>
-                        </div>
-                        {% endif %}
-                        <div class="field">
-                            <div class="label">Submitted At:</div>
-                            <div class="value">{{ submitted_at }}</div>
-                        </div>
-                    </div>
-                    <div class="footer">
-                        <p>This email was sent from your portfolio contact form.</p>
-                    </div>
-                </div>
-            </body>
-            </html>
-            """
+            # Attach the upload when it is small enough, otherwise link to it
+            attachment_path = contact_data.get('attachment_path')
+            attachment_size = contact_data.get('attachment_size') or 0
+            attachment_link = None
+            if attachment_path and attachment_size > self.max_attachment_bytes:
+                attachment_path = None
+                attachment_link = contact_data.get('attachment_link')
+                if not attachment_link:
+                    logger.warning("Attachment too large to email and no signed link available for %s", contact_data.get('id'))
             
-            template = Template(html_template)
-            html_content = template.render(**contact_data)
+            template = get_template("contact_notification")
+            html_content = template.render({
+                **contact_data,
+                "attachment_link": attachment_link,
+                "attachment_size_label": f"{attachment_size / (1024 * 1024):.1f} MB"
+            })
             
             # Text content
             text_content = f"""
@@ -109,70 +314,65 @@ class EmailService:
             Message: {contact_data['message']}
             Submitted At: {contact_data['submitted_at']}
             """
+            if attachment_link:
+                text_content += f"Attachment: {contact_data.get('attachment_filename')} (too large to attach) {attachment_link}\n"
             
             return self._send_email(
                 to_email=self.to_email,
                 subject=subject,
                 html_content=html_content,
-                text_content=text_content
+                text_content=text_content,
+                attachment_path=attachment_path,
+                attachment_filename=contact_data.get('attachment_filename'),
+                attachment_type=contact_data.get('attachment_type')
             )
             
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Failed to send contact form notification: {str(e)}")
             return False
     
+    def send_contact_digest(self, contacts: List[dict], deadline: Optional[float] = None) -> bool:
+        """Send one summary email covering several contact form submissions, giving up at ``deadline`` if set"""
+        try:
+            subject = f"Contact Form Digest: {len(contacts)} new submission{'s' if len(contacts) != 1 else ''}"
+            
+            template = get_template("contact_digest")
+            html_content = template.render(
+                contacts=contacts,
+                first_submitted_at=contacts[0]['submitted_at'],
+                last_submitted_at=contacts[-1]['submitted_at']
+            )
+            
+            text_content = "\n\n".join(
+                f"From: {contact['name']} <{contact['email']}>\n"
+                f"Subject: {contact['subject']}\n"
+                f"Submitted At: {contact['submitted_at']}\n"
+                f"Message: {contact['message']}"
+                for contact in contacts
+            )
+            
+            return self._send_email(
+                to_email=self.to_email,
+                subject=subject,
+                html_content=html_content,
+                text_content=f"{subject}\n\n{text_content}",
+                deadline=deadline
+            )
+            
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to send contact form digest: {str(e)}")
+            return False
+    
     def send_auto_reply(self, contact_data: dict) -> bool:
         """Send auto-reply to the person who submitted the contact form"""
         try:
             subject = f"Thank you for contacting me - {contact_data['subject']}"
             
-            html_template = """
-            <html>
-            <head>
-                <style>
-                    body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
-                    .container { max-width: 600px; margin: 0 auto; padding: 20px; }
-                    .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 8px 8px 0 0; }
-                    .content { background: #f8f9fa; padding: 20px; border-radius: 0 0 8px 8px; }
-                    .message-box { background: white; padding: 15px; border-radius: 4px; border-left: 4px solid #28a745; }
-                    .footer { margin-top: 20px; font-size: 12px; color: #666; text-align: center; }
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h2>👋 Thank you for reaching out!</h2>
-                    </div>
-                    <div class="content">
-                        <p>Hi {{ name }},</p>
-                        <p>Thank you for contacting me through my portfolio website. I have received your message and will get back to you as soon as possible.</p>
-                        
-                        <div class="message-box">
-                            <h4>Your Message:</h4>
-                            <p><strong>Subject:</strong> {{ subject }}</p>
-                            <p><strong>Message:</strong> {{ message }}</p>
-                        </div>
-                        
-                        <p>I typically respond within 24-48 hours. In the meantime, feel free to:</p>
-                        <ul>
-                            <li>Check out my latest projects on <a href="https://github.com/shubham-kadam">GitHub</a></li>
-                            <li>Connect with me on <a href="https://linkedin.com/in/shubham-kadam">LinkedIn</a></li>
-                            <li>View my data science work on <a href="https://kaggle.com/shubhamkadam">Kaggle</a></li>
-                        </ul>
-                        
-                        <p>Best regards,<br>
-                        <strong>Shubham Kadam</strong><br>
-                        Data Analyst & Developer</p>
-                    </div>
-                    <div class="footer">
-                        <p>This is an automated response. Please do not reply to this email.</p>
-                    </div>
-                </div>
-            </body>
-            </html>
-            """
-            
-            template = Template(html_template)
+            template = get_template("auto_reply")
             html_content = template.render(**contact_data)
             
             text_content = f"""
@@ -198,52 +398,193 @@ class EmailService:
                 text_content=text_content
             )
             
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Failed to send auto-reply: {str(e)}")
             return False
     
-    def _send_email(self, to_email: str, subject: str, html_content: str, text_content: str, attachment_path: Optional[str] = None) -> bool:
-        """Send email using SMTP"""
+    def _send_email(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: str,
+        attachment_path: Optional[str] = None,
+        attachment_filename: Optional[str] = None,
+        attachment_type: Optional[str] = None,
+        deadline: Optional[float] = None
+    ) -> bool:
+        """Send email using SMTP; raises CircuitOpenError instead of trying while the circuit is open.
+
+        Delivery is bounded by ``total_timeout`` and, if given, by the absolute
+        ``deadline`` (``time.monotonic()`` based).
+        """
         try:
             # Create message
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = f"{self.from_name} <{self.from_email}>"
-            message["To"] = to_email
+            body = MIMEMultipart("alternative")
             
             # Add text and HTML parts
             text_part = MIMEText(text_content, "plain")
             html_part = MIMEText(html_content, "html")
             
-            message.attach(text_part)
-            message.attach(html_part)
+            body.attach(text_part)
+            body.attach(html_part)
             
-            # Add attachment if provided
+            # Add attachment if provided; its body is streamed from disk at send time
+            placeholder = None
             if attachment_path and os.path.exists(attachment_path):
-                with open(attachment_path, "rb") as attachment:
-                    part = MIMEBase('application', 'octet-stream')
-                    part.set_payload(attachment.read())
-                    encoders.encode_base64(part)
-                    part.add_header(
-                        'Content-Disposition',
-                        f'attachment; filename= {os.path.basename(attachment_path)}'
-                    )
-                    message.attach(part)
-            
-            # Send email
-            context = ssl.create_default_context()
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls(context=context)
-                if self.smtp_username and self.smtp_password:
-                    server.login(self.smtp_username, self.smtp_password)
-                server.send_message(message)
-                
-            logger.info(f"Email sent successfully to {to_email}")
-            return True
+                message = MIMEMultipart("mixed")
+                message.attach(body)
+                placeholder = f"attachment-{secrets.token_hex(16)}"
+                maintype, _, subtype = (attachment_type or "application/octet-stream").partition("/")
+                part = MIMEBase(maintype, subtype or "octet-stream")
+                part.set_payload(placeholder)
+                part["Content-Transfer-Encoding"] = "base64"
+                part.add_header(
+                    'Content-Disposition',
+                    'attachment',
+                    filename=attachment_filename or os.path.basename(attachment_path)
+                )
+                message.attach(part)
+            else:
+                message = body
+            
+            message["Subject"] = subject
+            message["From"] = f"{self.from_name} <{self.from_email}>"
+            message["To"] = to_email
             
         except Exception as e:
+            logger.error(f"Failed to build email to {to_email}: {str(e)}")
+            return False
+
+        # Fail fast instead of waiting out timeouts while the server is known to be down;
+        # callers tell this apart from a failed send so they can defer rather than drop
+        if not self.circuit.allow():
+            logger.warning("SMTP circuit open, not sending email to %s", to_email)
+            raise CircuitOpenError(self.circuit.name)
+
+        expires = time.monotonic() + self.total_timeout
+        deadline = expires if deadline is None else min(expires, deadline)
+        try:
+            with self._session(deadline) as server:
+                if placeholder:
+                    self._send_streamed(server, message, to_email, placeholder, attachment_path, deadline)
+                else:
+                    self._arm(server, deadline)
+                    server.send_message(message)
+        except SMTP_REJECTIONS as e:
+            # The server is up and answering; it refused this particular message
+            self.circuit.record_success()
             logger.error(f"Failed to send email to {to_email}: {str(e)}")
             return False
+        except Exception as e:
+            self.circuit.record_failure()
+            logger.error(f"Failed to send email to {to_email}: {e!r}")
+            return False
+
+        self.circuit.record_success()
+        logger.info("Email sent successfully to %s", to_email)
+        return True
+
+    @contextmanager
+    def _session(self, deadline: float) -> Iterator[smtplib.SMTP]:
+        """An authenticated SMTP connection, kept open and reused between sends.
+
+        A reused connection is checked with NOOP first, since servers drop
+        idle sessions; any error during a send closes it so the next send
+        starts from a clean session. Waiting for another thread's send
+        counts against ``deadline`` too.
+        """
+        if not self._smtp_lock.acquire(timeout=max(deadline - time.monotonic(), 0)):
+            raise TimeoutError("Timed out waiting for the SMTP session")
+        try:
+            if self._smtp is not None:
+                try:
+                    self._arm(self._smtp, deadline)
+                    if self._smtp.noop()[0] != 250:
+                        self._close_session()
+                except (smtplib.SMTPException, OSError):
+                    self._close_session()
+            if self._smtp is None:
+                self._smtp = self._connect(deadline)
+            try:
+                yield self._smtp
+            except Exception:
+                self._close_session()
+                raise
+        finally:
+            self._smtp_lock.release()
+
+    def _arm(self, server: smtplib.SMTP, deadline: float):
+        """Bound the next socket operation by the send timeout and what is left of the deadline"""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"SMTP delivery exceeded {self.total_timeout:.0f}s")
+        server.sock.settimeout(min(self.send_timeout, remaining))
+
+    def _connect(self, deadline: float) -> smtplib.SMTP:
+        server = smtplib.SMTP(timeout=min(self.connect_timeout, max(deadline - time.monotonic(), 0.001)))
+        try:
+            server.connect(self.smtp_host, self.smtp_port)
+            self._arm(server, deadline)
+            server.starttls(context=self._ssl_context)
+            # The server forgets the pre-TLS EHLO (RFC 3207); login() would re-greet, MAIL FROM alone does not
+            self._arm(server, deadline)
+            server.ehlo()
+            if self.smtp_username and self.smtp_password:
+                self._arm(server, deadline)
+                server.login(self.smtp_username, self.smtp_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _close_session(self):
+        server, self._smtp = self._smtp, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def _send_streamed(self, server: smtplib.SMTP, message: MIMEMultipart, to_email: str, placeholder: str, attachment_path: str, deadline: float):
+        """Run the SMTP DATA phase by hand, base64-encoding the attachment from disk in place of ``placeholder``.
+
+        Only the headers and text parts are rendered in memory; the attachment
+        is read and encoded a block at a time, so memory stays flat whatever
+        its size.
+        """
+        head, tail = message.as_bytes(policy=SMTP_POLICY).split(placeholder.encode("ascii"), 1)
+        if tail.startswith(b"\r\n"):
+            tail = tail[2:]
+        if not tail.endswith(b"\r\n"):
+            tail += b"\r\n"
+
+        self._arm(server, deadline)
+        code, response = server.mail(self.from_email)
+        if code != 250:
+            raise smtplib.SMTPSenderRefused(code, response, self.from_email)
+        code, response = server.rcpt(to_email)
+        if code not in (250, 251):
+            raise smtplib.SMTPRecipientsRefused({to_email: (code, response)})
+        server.putcmd("data")
+        code, response = server.getreply()
+        if code != 354:
+            raise smtplib.SMTPDataError(code, response)
+
+        # base64 lines never start with a dot, so only the rendered parts need dot-stuffing
+        server.send(_LEADING_DOT_RE.sub(b"..", head))
+        for lines in iter_base64_lines(file_handler.iter_file(attachment_path)):
+            self._arm(server, deadline)
+            server.send(lines)
+        self._arm(server, deadline)
+        server.send(_LEADING_DOT_RE.sub(b"..", tail) + b".\r\n")
+
+        code, response = server.getreply()
+        if code != 250:
+            raise smtplib.SMTPDataError(code, response)
 
 # Create global instance
 email_service = EmailService()
\ No newline at end of file
@@ -0,0 +1,133 @@
+import ipaddress
+import os
+import re
+import logging
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from utils.metrics import metrics
+
+try:
+    import maxminddb
+except ImportError:  # pragma: no cover - maxminddb is listed in requirements.txt
+    maxminddb = None
+
+logger = logging.getLogger(__name__)
+
+BOT_RE = re.compile(
+    r"bot|crawl|spider|slurp|preview|headless|curl|wget|python-requests|python-urllib|httpx|aiohttp"
+    r"|go-http-client|java/|okhttp|axios|node-fetch|libwww|scrapy|phantomjs",
+    re.IGNORECASE
+)
+# Checked in order: several browsers also claim to be Chrome and/or Safari
+BROWSER_PATTERNS = [
+    ("Edge", re.compile(r"Edg(?:e|A|iOS)?/(\d+)")),
+    ("Opera", re.compile(r"(?:OPR|Opera)/(\d+)")),
+    ("Samsung Internet", re.compile(r"SamsungBrowser/(\d+)")),
+    ("Firefox", re.compile(r"(?:Firefox|FxiOS)/(\d+)")),
+    ("Chrome", re.compile(r"(?:Chrome|CriOS)/(\d+)")),
+    ("Safari", re.compile(r"Version/(\d+)[\d.]* (?:Mobile/\S+ )?Safari/")),
+    ("Internet Explorer", re.compile(r"(?:MSIE |Trident/.*rv:)(\d+)")),
+]
+OS_PATTERNS = [
+    ("iOS", re.compile(r"(?:iPhone|iPad|iPod)")),
+    ("Android", re.compile(r"Android")),
+    ("Windows", re.compile(r"Windows")),
+    ("macOS", re.compile(r"Mac OS X|Macintosh")),
+    ("Chrome OS", re.compile(r"CrOS")),
+    ("Linux", re.compile(r"Linux|X11")),
+]
+TABLET_RE = re.compile(r"iPad|Tablet|Kindle|Silk/")
+MOBILE_RE = re.compile(r"Mobi|iPhone|iPod|Android|Windows Phone")
+
+def parse_user_agent(user_agent: str) -> Tuple[Optional[str], Optional[str], Optional[str], str]:
+    """(browser, browser major version, os, device type) for a User-Agent header"""
+    if BOT_RE.search(user_agent):
+        device = "bot"
+    elif TABLET_RE.search(user_agent) or ("Android" in user_agent and "Mobile" not in user_agent):
+        device = "tablet"
+    elif MOBILE_RE.search(user_agent):
+        device = "mobile"
+    else:
+        device = "desktop"
+
+    browser = browser_version = None
+    for name, pattern in BROWSER_PATTERNS:
+        match = pattern.search(user_agent)
+        if match:
+            browser, browser_version = name, match.group(1)
+            break
+
+    os_name = next((name for name, pattern in OS_PATTERNS if pattern.search(user_agent)), None)
+    return browser, browser_version, os_name, device
+
+class SubmissionEnricher:
+    """Derives queryable client fields from a submission's User-Agent and IP address.
+
+    User agents are parsed with a small set of patterns and IPs are looked up
+    in a local MaxMind-format database (GeoLite2 or DB-IP Lite, City or
+    Country edition) at ``GEOIP_DATABASE_PATH``; nothing leaves the process.
+    Both lookups are memoized in bounded LRU caches since bots and repeat
+    visitors keep sending the same values.
+    """
+
+    def __init__(self):
+        self.cache_size = int(os.getenv('ENRICHMENT_CACHE_SIZE', '4096'))
+        self.geoip_path = os.getenv('GEOIP_DATABASE_PATH')
+        self._reader = self._open_reader()
+        self.parse_user_agent = lru_cache(maxsize=self.cache_size)(parse_user_agent)
+        self.locate = lru_cache(maxsize=self.cache_size)(self._locate)
+
+    def _open_reader(self):
+        if not self.geoip_path:
+            return None
+        if maxminddb is None:
+            logger.warning("GEOIP_DATABASE_PATH is set but maxminddb is not installed; IP geolocation disabled")
+            return None
+        try:
+            return maxminddb.open_database(self.geoip_path)
+        except Exception as e:
+            logger.error(f"Failed to open GeoIP database {self.geoip_path}: {str(e)}")
+            return None
+
+    def fields(self, ip_address: Optional[str], user_agent: Optional[str]) -> dict:
+        """Enrichment fields to store on a contact message"""
+        browser, browser_version, os_name, device = self.parse_user_agent(user_agent) if user_agent else (None, None, None, None)
+        country_code, country, city = self.locate(ip_address) if ip_address else (None, None, None)
+        return {
+            "ua_browser": browser,
+            "ua_browser_version": browser_version,
+            "ua_os": os_name,
+            "ua_device": device,
+            "geo_country_code": country_code,
+            "geo_country": country,
+            "geo_city": city,
+        }
+
+    def _locate(self, ip_address: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        if self._reader is None:
+            return None, None, None
+        try:
+            address = ipaddress.ip_address(ip_address)
+            if not address.is_global:
+                return None, None, None
+            record = self._reader.get(address) or {}
+        except ValueError:
+            return None, None, None
+        country = record.get("country") or record.get("registered_country") or {}
+        return (
+            country.get("iso_code"),
+            country.get("names", {}).get("en"),
+            record.get("city", {}).get("names", {}).get("en"),
+        )
+
+    def close(self):
+        if self._reader is not None:
+            self._reader.close()
+
+# Create global instance
+submission_enricher = SubmissionEnricher()
+metrics.register_gauge("enrichment_ua_cache_hits", lambda: submission_enricher.parse_user_agent.cache_info().hits)
+metrics.register_gauge("enrichment_ua_cache_misses", lambda: submission_enricher.parse_user_agent.cache_info().misses)
+metrics.register_gauge("enrichment_geo_cache_hits", lambda: submission_enricher.locate.cache_info().hits)
+metrics.register_gauge("enrichment_geo_cache_misses", lambda: submission_enricher.locate.cache_info().misses)
@@ -0,0 +1,144 @@
+import asyncio
+import os
+import signal
+import threading
+import time
+import logging
+from typing import Callable, Coroutine, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+STARTING = "starting"
+READY = "ready"
+DRAINING = "draining"
+STOPPED = "stopped"
+
+class Lifecycle:
+    """Process state shared by startup, readiness and coordinated shutdown.
+
+    Readiness only turns green once startup warm-up has finished. On SIGTERM
+    the process switches to draining: readiness fails, new requests are
+    turned away by the drain middleware and long-lived streams are closed,
+    while in-flight requests and tracked background tasks get until the
+    drain deadline to finish. Whatever is still running then is cancelled
+    and reported.
+
+    Under uvicorn the order is: SIGTERM starts the drain here (via the
+    chained signal handler), uvicorn stops accepting connections and waits
+    up to ``--timeout-graceful-shutdown`` for open requests, and only then
+    runs the shutdown hook that calls ``drain()``. By that point requests
+    have normally finished, so ``drain()`` mostly waits on background
+    tasks; the two timeouts add up and must fit in the supervisor's
+    ``stopwaitsecs``.
+    """
+
+    def __init__(self):
+        self.drain_seconds = float(os.getenv('SHUTDOWN_DRAIN_SECONDS', '10'))
+        self.state = STARTING
+        self.in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._drain_callbacks: List[Callable[[], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    @property
+    def draining(self) -> bool:
+        return self.state in (DRAINING, STOPPED)
+
+    def mark_ready(self):
+        if self.state == STARTING:
+            self.state = READY
+            logger.info("Application ready")
+
+    def on_drain(self, callback: Callable[[], None]):
+        """Run ``callback`` as soon as draining starts, e.g. to end long-lived streams"""
+        self._drain_callbacks.append(callback)
+
+    def request_started(self):
+        self.in_flight += 1
+        self._idle.clear()
+
+    def request_finished(self):
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self._idle.set()
+
+    def spawn(self, coro: Coroutine, name: Optional[str] = None) -> asyncio.Task:
+        """Start a background task that shutdown waits for instead of cutting off"""
+        task = asyncio.create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def begin_drain(self):
+        if self.draining:
+            return
+        self.state = DRAINING
+        logger.info("Draining: %d requests and %d background tasks in flight", self.in_flight, len(self._tasks))
+        for callback in self._drain_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Drain callback error: {str(e)}")
+
+    async def drain(self, timeout: Optional[float] = None) -> dict:
+        """Wait for in-flight work up to the deadline, cancel the rest and report it"""
+        self.begin_drain()
+        started = time.monotonic()
+        deadline = started + (self.drain_seconds if timeout is None else timeout)
+
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            pass
+
+        tasks = [task for task in self._tasks if task is not asyncio.current_task()]
+        pending = set()
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=max(deadline - time.monotonic(), 0))
+            for task in pending:
+                task.cancel()
+
+        self.state = STOPPED
+        report = {
+            "requests_dropped": self.in_flight,
+            "tasks_cancelled": sorted(task.get_name() for task in pending),
+            "duration_seconds": round(time.monotonic() - started, 3),
+        }
+        if report["requests_dropped"] or pending:
+            logger.warning(
+                "Drain deadline passed: %d requests still in flight, cancelled tasks: %s",
+                report["requests_dropped"], ", ".join(report["tasks_cancelled"]) or "none"
+            )
+        else:
+            logger.info("Drained cleanly in %.3fs", report["duration_seconds"])
+        return report
+
+    def install_signal_handlers(self):
+        """Start draining on SIGTERM/SIGINT, before the server stops accepting connections.
+
+        The server's own handlers are chained, not replaced, so its shutdown
+        sequence is unchanged.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        self._loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            previous = signal.getsignal(sig)
+            if not callable(previous):
+                # Nothing to chain to: leave default termination alone
+                continue
+
+            def handler(signum, frame, previous=previous):
+                self._loop.call_soon_threadsafe(self.begin_drain)
+                previous(signum, frame)
+
+            signal.signal(sig, handler)
+
+# Create global instance
+lifecycle = Lifecycle()
@@ -0,0 +1,145 @@
+import asyncio
+import os
+import time
+import logging
+from typing import Dict, List, Optional
+
+from models.tenant import Tenant
+from services.tenants import current_tenant, tenant_registry
+from utils.circuit_breaker import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+class NotificationDigest:
+    """Batches owner notification emails into periodic digests.
+
+    When enabled, submissions are buffered per tenant and sent as a single
+    summary email to that tenant's inbox once the window elapses or the count
+    threshold is reached. Urgent submissions (those with attachments) bypass
+    the buffer and are sent immediately. Auto-replies are not affected.
+
+    When a tenant's SMTP circuit refuses a send (open, or half-open with its
+    trial call already taken), notifications that would have been sent
+    immediately are buffered the same way and go out as a digest once the
+    circuit lets calls through again.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv('NOTIFICATION_DIGEST_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+        self.window_seconds = float(os.getenv('NOTIFICATION_DIGEST_WINDOW_SECONDS', '300'))
+        self.max_messages = int(os.getenv('NOTIFICATION_DIGEST_MAX_MESSAGES', '25'))
+        # Upper bound on buffered notifications kept for retry after failed sends
+        self.max_pending = max(self.max_messages, int(os.getenv('NOTIFICATION_DIGEST_MAX_PENDING', '500')))
+        self._pending: Dict[str, List[dict]] = {}
+        self._tenants: Dict[str, Tenant] = {}
+        self._timers: Dict[str, asyncio.Task] = {}
+        self._flush_lock = asyncio.Lock()
+
+    @property
+    def pending_count(self) -> int:
+        return sum(len(batch) for batch in self._pending.values())
+
+    def is_urgent(self, contact_data: dict) -> bool:
+        return bool(contact_data.get('has_attachment'))
+
+    async def notify(self, contact_data: dict) -> bool:
+        """Send or queue the owner notification for one submission"""
+        tenant = current_tenant()
+        service = tenant_registry.email_service(tenant)
+        if not self.enabled or self.is_urgent(contact_data):
+            try:
+                return await asyncio.to_thread(service.send_contact_form_notification, contact_data)
+            except CircuitOpenError:
+                logger.warning(f"SMTP circuit open, deferring owner notification for tenant {tenant.id}")
+                self._enqueue(tenant, contact_data)
+                self._schedule(tenant.id, delay=self._retry_delay(service))
+                return True
+
+        pending = self._enqueue(tenant, contact_data)
+        if len(pending) >= self.max_messages:
+            # Flush now, but from a background task: this submission must not wait on the digest email
+            self._cancel_timer(tenant.id)
+            self._schedule(tenant.id, delay=0)
+            return True
+
+        self._schedule(tenant.id)
+        return True
+
+    def _enqueue(self, tenant: Tenant, contact_data: dict) -> List[dict]:
+        self._tenants[tenant.id] = tenant
+        pending = self._pending.setdefault(tenant.id, [])
+        pending.append(contact_data)
+        return pending
+
+    async def flush(self, deadline: Optional[float] = None) -> bool:
+        """Send everything currently buffered, one digest email per tenant.
+
+        With a ``deadline`` (``time.monotonic()`` based), sends are cut short
+        there and tenants not reached by then stay queued.
+        """
+        results = [await self._flush_tenant(tenant_id, deadline) for tenant_id in list(self._pending)]
+        return all(results)
+
+    async def _flush_tenant(self, tenant_id: str, deadline: Optional[float] = None) -> bool:
+        async with self._flush_lock:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            self._cancel_timer(tenant_id)
+            batch = self._pending.pop(tenant_id, None)
+            if not batch:
+                return True
+
+            service = tenant_registry.email_service(self._tenants[tenant_id])
+            retry_delay = None
+            try:
+                sent = await asyncio.to_thread(service.send_contact_digest, batch, deadline)
+            except asyncio.CancelledError:
+                # Keep the batch counted as pending; the send may still finish in its thread
+                self._pending[tenant_id] = batch + self._pending.get(tenant_id, [])
+                raise
+            except CircuitOpenError:
+                sent = False
+                retry_delay = self._retry_delay(service)
+            if sent:
+                logger.info(f"Sent notification digest for tenant {tenant_id} covering {len(batch)} submissions")
+                return True
+
+            # Keep the batch for the next flush, dropping the oldest entries past the cap
+            pending = batch + self._pending.get(tenant_id, [])
+            overflow = len(pending) - self.max_pending
+            if overflow > 0:
+                del pending[:overflow]
+                logger.error(f"Dropped {overflow} queued notifications for tenant {tenant_id} after repeated digest failures")
+            self._pending[tenant_id] = pending
+            logger.warning(f"Failed to send notification digest for tenant {tenant_id}, {len(pending)} notifications still queued")
+            self._schedule(tenant_id, delay=retry_delay)
+            return False
+
+    def _retry_delay(self, service) -> float:
+        # Half-open circuits report no wait but may have their trial call in flight; back off a little
+        return max(service.circuit.retry_after, 1.0)
+
+    def _schedule(self, tenant_id: str, delay: Optional[float] = None):
+        if tenant_id not in self._timers:
+            self._timers[tenant_id] = asyncio.create_task(
+                self._flush_after_window(tenant_id, self.window_seconds if delay is None else delay)
+            )
+
+    async def _flush_after_window(self, tenant_id: str, delay: float):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            return
+        self._timers.pop(tenant_id, None)
+        try:
+            await self._flush_tenant(tenant_id)
+        except Exception as e:
+            logger.error(f"Notification digest flush error: {str(e)}")
+
+    def _cancel_timer(self, tenant_id: str):
+        timer = self._timers.pop(tenant_id, None)
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+
+# Create global instance
+notification_digest = NotificationDigest()
@@ -0,0 +1,99 @@
+import os
+import time
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class QueryPlanVerdict:
+    collection_scan: bool
+    # Whether the plan was actually inspected; False when explain was unavailable
+    checked: bool = True
+
+def _query_shape(query: dict) -> Tuple:
+    """Field names and operators of a query, without its values"""
+    return tuple(sorted(
+        (name, tuple(sorted(value)) if isinstance(value, dict) else None)
+        for name, value in query.items()
+    ))
+
+def _winning_plans(explanation: Any) -> Iterator[Any]:
+    """Every winningPlan in an explain result; aggregations nest theirs under their stages"""
+    if isinstance(explanation, dict):
+        for name, value in explanation.items():
+            if name == "winningPlan":
+                yield value
+            elif name != "rejectedPlans":
+                yield from _winning_plans(value)
+    elif isinstance(explanation, list):
+        for value in explanation:
+            yield from _winning_plans(value)
+
+def _has_collection_scan(plan: Any) -> bool:
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(_has_collection_scan(value) for value in plan.values())
+    if isinstance(plan, list):
+        return any(_has_collection_scan(value) for value in plan)
+    return False
+
+class QueryPlanGuard:
+    """Explains ad-hoc admin queries and flags the ones that would scan a whole collection.
+
+    Verdicts are cached per collection and query shape (field names and
+    operators, not values) for ``cache_seconds``, so explain runs once per
+    shape rather than once per request. ``policy`` is "reject" to refuse
+    such queries outright or "cap" to run them with a smaller limit and a
+    server-side time limit.
+    """
+
+    def __init__(self):
+        self.policy = os.getenv('QUERY_GUARD_POLICY', 'reject').lower()
+        self.cache_seconds = float(os.getenv('QUERY_GUARD_CACHE_SECONDS', '300'))
+        self.capped_limit = int(os.getenv('QUERY_GUARD_CAPPED_LIMIT', '20'))
+        self.capped_max_time_ms = int(os.getenv('QUERY_GUARD_CAPPED_MAX_TIME_MS', '500'))
+        self._verdicts: Dict[Tuple, Tuple[float, QueryPlanVerdict]] = {}
+
+    async def check(self, collection, query: dict, sort: List[Tuple[str, int]]) -> QueryPlanVerdict:
+        key = (collection.name, _query_shape(query), tuple(sort))
+        return await self._verdict(key, collection, lambda: collection.find(query).sort(sort).limit(1).explain())
+
+    async def check_aggregate(self, collection, pipeline: List[dict]) -> QueryPlanVerdict:
+        """Same as check() for an aggregation, explaining the pipeline as it will run"""
+        match = pipeline[0].get("$match", {}) if pipeline else {}
+        key = (collection.name, _query_shape(match), tuple(next(iter(stage)) for stage in pipeline))
+        return await self._verdict(key, collection, lambda: collection.database.command(
+            {"aggregate": collection.name, "pipeline": pipeline, "explain": True}
+        ))
+
+    async def _verdict(self, key: Tuple, collection, explain: Callable[[], Awaitable[dict]]) -> QueryPlanVerdict:
+        cached = self._verdicts.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_seconds:
+            return cached[1]
+
+        try:
+            explanation = await explain()
+        except Exception as e:
+            # Fail open: an unavailable explain should not take the inbox down
+            logger.warning(f"Could not explain query on {collection.name}: {str(e)}")
+            return QueryPlanVerdict(collection_scan=False, checked=False)
+
+        verdict = QueryPlanVerdict(collection_scan=any(_has_collection_scan(plan) for plan in _winning_plans(explanation)))
+        if verdict.collection_scan:
+            logger.warning("Query shape %s on %s would scan the whole collection", list(key[1]), collection.name)
+        self._verdicts[key] = (time.monotonic(), verdict)
+        return verdict
+
+    def forget(self, collection_name: Optional[str] = None):
+        """Drop cached verdicts, e.g. after indexes change"""
+        if collection_name is None:
+            self._verdicts.clear()
+        else:
+            for key in [key for key in self._verdicts if key[0] == collection_name]:
+                del self._verdicts[key]
+
+# Create global instance
+query_guard = QueryPlanGuard()
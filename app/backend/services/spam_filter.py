@@ -0,0 +1,268 @@
+import math
+import os
+import re
+import time
+import logging
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+
+from database import db
+from services.tenants import tenant_collection
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9'_-]{1,23}")
+LINK_RE = re.compile(r"(?:https?://|www\.)\S+|\b[a-z0-9-]+\.(?:com|net|org|ru|cn|xyz|top|info|biz|io)\b", re.IGNORECASE)
+MODEL_STATS_ID = "__documents__"
+
+@dataclass
+class SpamVerdict:
+    score: float = 0.0
+    reasons: List[str] = field(default_factory=list)
+    is_spam: bool = False
+    spam_probability: Optional[float] = None
+
+class CountMinSketch:
+    """Fixed-size frequency sketch; estimates never undercount"""
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.rows = [array('I', bytes(4 * width)) for _ in range(depth)]
+
+    def add(self, key: str) -> int:
+        estimate = None
+        for seed, row in enumerate(self.rows):
+            index = hash((seed, key)) % self.width
+            row[index] = min(row[index] + 1, 0xFFFFFFFF)
+            estimate = row[index] if estimate is None else min(estimate, row[index])
+        return estimate
+
+    def estimate(self, key: str) -> int:
+        return min(row[hash((seed, key)) % self.width] for seed, row in enumerate(self.rows))
+
+class WindowedSketch:
+    """Approximate per-key counts over the last one to two windows.
+
+    Two count-min sketches are rotated every ``window_seconds`` so memory is
+    constant regardless of how many distinct senders are seen.
+    """
+
+    def __init__(self, window_seconds: int, width: int = 2048, depth: int = 4):
+        self.window_seconds = window_seconds
+        self.width = width
+        self.depth = depth
+        self.current = CountMinSketch(width, depth)
+        self.previous = CountMinSketch(width, depth)
+        self.rotated_at = time.monotonic()
+
+    def add(self, key: str) -> int:
+        self._maybe_rotate()
+        return self.current.add(key) + self.previous.estimate(key)
+
+    def _maybe_rotate(self):
+        now = time.monotonic()
+        if now - self.rotated_at < self.window_seconds:
+            return
+        if now - self.rotated_at >= 2 * self.window_seconds:
+            self.previous = CountMinSketch(self.width, self.depth)
+        else:
+            self.previous = self.current
+        self.current = CountMinSketch(self.width, self.depth)
+        self.rotated_at = now
+
+def tokenize(text: str, max_tokens: int = 300) -> List[str]:
+    """Unique lower-cased tokens of a message, with links collapsed to one marker token"""
+    tokens = {}
+    for _ in LINK_RE.finditer(text):
+        tokens["__link__"] = None
+        break
+    for match in TOKEN_RE.finditer(LINK_RE.sub(" ", text.lower())):
+        tokens[match.group()] = None
+        if len(tokens) >= max_tokens:
+            break
+    return list(tokens)
+
+class NaiveBayesClassifier:
+    """Multinomial naive Bayes over message tokens, trained incrementally.
+
+    Token counts live in memory and are mirrored to the ``spam_model``
+    collection with ``$inc`` updates so every worker can load them on startup.
+    """
+
+    def __init__(self, collection_name: str = "spam_model"):
+        self.collection_name = collection_name
+        self.token_counts: Dict[str, List[int]] = {}
+        self.document_counts = [0, 0]  # [ham, spam]
+        self.token_totals = [0, 0]
+        self.min_documents = int(os.getenv('SPAM_BAYES_MIN_DOCUMENTS', '20'))
+
+    @property
+    def collection(self):
+        return db[self.collection_name]
+
+    @property
+    def ready(self) -> bool:
+        return min(self.document_counts) > 0 and sum(self.document_counts) >= self.min_documents
+
+    async def load(self):
+        self.token_counts.clear()
+        self.document_counts = [0, 0]
+        self.token_totals = [0, 0]
+        async for doc in self.collection.find({}):
+            counts = [max(doc.get("ham", 0), 0), max(doc.get("spam", 0), 0)]
+            if doc["_id"] == MODEL_STATS_ID:
+                self.document_counts = counts
+            else:
+                self.token_counts[doc["_id"]] = counts
+                self.token_totals[0] += counts[0]
+                self.token_totals[1] += counts[1]
+        logger.info(f"Loaded spam model: {len(self.token_counts)} tokens, {sum(self.document_counts)} documents")
+
+    async def learn(self, text: str, is_spam: bool, weight: int = 1):
+        """Add (weight=1) or remove (weight=-1) one labelled message"""
+        label = 1 if is_spam else 0
+        key = "spam" if is_spam else "ham"
+        tokens = tokenize(text)
+
+        self.document_counts[label] = max(0, self.document_counts[label] + weight)
+        for token in tokens:
+            counts = self.token_counts.setdefault(token, [0, 0])
+            updated = max(0, counts[label] + weight)
+            self.token_totals[label] += updated - counts[label]
+            counts[label] = updated
+
+        operations = [UpdateOne({"_id": MODEL_STATS_ID}, {"$inc": {key: weight}}, upsert=True)]
+        operations.extend(UpdateOne({"_id": token}, {"$inc": {key: weight}}, upsert=True) for token in tokens)
+        await self.collection.bulk_write(operations, ordered=False)
+
+    def spam_probability(self, tokens: Iterable[str]) -> float:
+        ham_docs, spam_docs = self.document_counts
+        total_docs = ham_docs + spam_docs
+        vocabulary = max(len(self.token_counts), 1)
+        ham_total = self.token_totals[0] + vocabulary
+        spam_total = self.token_totals[1] + vocabulary
+
+        log_ham = math.log(ham_docs / total_docs)
+        log_spam = math.log(spam_docs / total_docs)
+        for token in tokens:
+            counts = self.token_counts.get(token)
+            if counts is None:
+                continue
+            log_ham += math.log((counts[0] + 1) / ham_total)
+            log_spam += math.log((counts[1] + 1) / spam_total)
+
+        delta = max(min(log_ham - log_spam, 700), -700)
+        return 1.0 / (1.0 + math.exp(delta))
+
+class SpamFilter:
+    """Staged scoring run before a submission is persisted.
+
+    Cheap checks run first (honeypot, time-to-submit, link density, repeat
+    senders); the naive Bayes stage only runs when they are inconclusive and
+    the model has seen enough labelled messages. Scores add up and a total at
+    or above ``threshold`` marks the submission as spam.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv('SPAM_FILTER_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+        self.threshold = float(os.getenv('SPAM_SCORE_THRESHOLD', '1.0'))
+        self.min_submit_seconds = float(os.getenv('SPAM_MIN_SUBMIT_SECONDS', '3'))
+        self.max_link_density = float(os.getenv('SPAM_MAX_LINK_DENSITY', '0.1'))
+        self.max_links = int(os.getenv('SPAM_MAX_LINKS', '3'))
+        self.repeat_sender_limit = int(os.getenv('SPAM_REPEAT_SENDER_LIMIT', '5'))
+        self.bayes_weight = float(os.getenv('SPAM_BAYES_WEIGHT', '0.8'))
+        self.quarantine_collection = os.getenv('SPAM_QUARANTINE_COLLECTION', 'contact_quarantine')
+        self.senders = WindowedSketch(int(os.getenv('SPAM_REPEAT_SENDER_WINDOW_SECONDS', '3600')))
+        self.classifier = NaiveBayesClassifier()
+
+    async def load(self):
+        try:
+            await self.classifier.load()
+        except Exception as e:
+            logger.error(f"Failed to load spam model: {str(e)}")
+
+    def evaluate(
+        self,
+        email: str,
+        subject: str,
+        message: str,
+        ip_address: Optional[str] = None,
+        honeypot: Optional[str] = None,
+        form_started_at: Optional[float] = None
+    ) -> SpamVerdict:
+        """Score one submission; pure CPU work, no I/O"""
+        verdict = SpamVerdict()
+        if not self.enabled:
+            return verdict
+
+        # Stage 1: honeypot field is invisible to humans, anything in it is a bot
+        if honeypot and honeypot.strip():
+            verdict.score = self.threshold
+            verdict.reasons.append("honeypot")
+            verdict.is_spam = True
+            return verdict
+
+        # Stage 2: filled in faster than a human could type
+        if form_started_at:
+            elapsed = time.time() - form_started_at / 1000.0
+            if 0 <= elapsed < self.min_submit_seconds:
+                verdict.score += 0.6
+                verdict.reasons.append("fast_submit")
+
+        # Stage 3: link density
+        text = f"{subject}\n{message}"
+        links = len(LINK_RE.findall(text))
+        words = max(len(text.split()), 1)
+        if links > self.max_links or (links and links / words > self.max_link_density):
+            verdict.score += 0.5
+            verdict.reasons.append("link_density")
+
+        # Stage 4: repeat senders by address and by IP
+        sender_count = self.senders.add(f"email:{email.lower()}")
+        if ip_address:
+            sender_count = max(sender_count, self.senders.add(f"ip:{ip_address}"))
+        if sender_count > self.repeat_sender_limit:
+            verdict.score += 0.5
+            verdict.reasons.append("repeat_sender")
+
+        # Stage 5: naive Bayes, only when the cheap checks are inconclusive
+        if verdict.score < self.threshold and self.classifier.ready:
+            probability = self.classifier.spam_probability(tokenize(text))
+            verdict.spam_probability = round(probability, 4)
+            verdict.score += self.bayes_weight * (2 * probability - 1)
+            if probability >= 0.5:
+                verdict.reasons.append("bayes")
+
+        verdict.score = round(verdict.score, 3)
+        verdict.is_spam = verdict.score >= self.threshold
+        return verdict
+
+    async def quarantine(self, document: dict, verdict: SpamVerdict):
+        """Store a likely-spam submission away from the inbox"""
+        await tenant_collection(self.quarantine_collection).insert_one({
+            **document,
+            "spam_score": verdict.score,
+            "spam_reasons": verdict.reasons,
+            "spam_probability": verdict.spam_probability
+        })
+        logger.info("Quarantined contact submission %s: score=%s reasons=%s", document['id'], verdict.score, verdict.reasons)
+
+    async def train_from_status(self, message: dict, status: str):
+        """Learn from an admin status change: archived counts as spam, replied as ham"""
+        label = {"archived": "spam", "replied": "ham"}.get(status)
+        previous = message.get("spam_trained_as")
+        if label is None or label == previous:
+            return
+
+        text = f"{message.get('subject', '')}\n{message.get('message', '')}"
+        if previous:
+            await self.classifier.learn(text, previous == "spam", weight=-1)
+        await self.classifier.learn(text, label == "spam")
+        await tenant_collection("contact_messages").update_one({"id": message["id"]}, {"$set": {"spam_trained_as": label}})
+
+# Create global instance
+spam_filter = SpamFilter()
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import time
+import logging
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Set, Tuple
+
+from database import db, ensure_tenant_indexes
+from models.tenant import Tenant, DEFAULT_TENANT_ID
+from services.email_service import EmailService, email_service
+from services.lifecycle import lifecycle
+from services.query_guard import query_guard
+
+logger = logging.getLogger(__name__)
+
+TENANT_PATH_PREFIX = "/t/"
+
+class TenantRegistry:
+    """In-memory cache of tenant configuration from the ``tenants`` collection.
+
+    Lookups by host and by id are plain dict reads. The cache is reloaded in
+    the background once it is older than ``ttl`` seconds, so requests never
+    wait on a tenant query. Per-tenant EmailService instances are built on
+    first use and kept across reloads while the tenant's email settings stay
+    the same, so SMTP sessions and circuit state survive a refresh.
+    """
+
+    def __init__(self):
+        self.ttl = float(os.getenv('TENANT_CACHE_TTL_SECONDS', '60'))
+        self.default = Tenant(id=DEFAULT_TENANT_ID)
+        self._by_id: Dict[str, Tenant] = {DEFAULT_TENANT_ID: self.default}
+        self._by_host: Dict[str, Tenant] = {}
+        self._by_collection_prefix: Dict[str, Tenant] = {"": self.default}
+        self._email_services: Dict[str, Tuple[dict, EmailService]] = {}
+        self._indexed: Set[str] = set()
+        self._loaded_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def load(self):
+        by_id = {DEFAULT_TENANT_ID: self.default}
+        async for doc in db.tenants.find({}):
+            doc["id"] = doc.pop("_id")
+            try:
+                tenant = Tenant.model_validate(doc)
+            except ValueError as e:
+                logger.error(f"Invalid tenant config {doc['id']}: {str(e)}")
+                continue
+            by_id[tenant.id] = tenant
+
+        self._by_id = by_id
+        self._by_host = {host.lower(): tenant for tenant in by_id.values() for host in tenant.hosts}
+        self._by_collection_prefix = {tenant.collection_prefix: tenant for tenant in by_id.values()}
+        self._retire_email_services(by_id)
+        self._loaded_at = time.monotonic()
+
+    def _retire_email_services(self, by_id: Dict[str, Tenant]):
+        """Drop services of removed or reconfigured tenants and close their SMTP sessions"""
+        kept = {}
+        for tenant_id, (settings, service) in self._email_services.items():
+            tenant = by_id.get(tenant_id)
+            if tenant is not None and tenant.email_settings == settings:
+                kept[tenant_id] = (settings, service)
+            else:
+                lifecycle.spawn(asyncio.to_thread(service.close), name=f"tenant-smtp-close-{tenant_id}")
+        self._email_services = kept
+
+    async def close_email_services(self, timeout: Optional[float] = None):
+        """Close every tenant's SMTP session (shutdown)"""
+        services, self._email_services = self._email_services, {}
+        await asyncio.gather(*(asyncio.to_thread(service.close, timeout) for _, service in services.values()))
+
+    def refresh_if_stale(self):
+        if time.monotonic() - self._loaded_at < self.ttl:
+            return
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _refresh(self):
+        try:
+            await self.load()
+        except Exception as e:
+            # Keep serving the cached config and try again after the next TTL
+            self._loaded_at = time.monotonic()
+            logger.error(f"Failed to refresh tenant config: {str(e)}")
+
+    def get(self, tenant_id: str) -> Optional[Tenant]:
+        return self._by_id.get(tenant_id)
+
+    def all(self) -> List[Tenant]:
+        return list(self._by_id.values())
+
+    def for_host(self, host: str) -> Tenant:
+        return self._by_host.get(host.split(":", 1)[0].lower(), self.default)
+
+    def for_collection(self, collection_name: str, base_name: str) -> Optional[Tenant]:
+        """Tenant owning ``collection_name``, a prefixed form of ``base_name``"""
+        if not collection_name.endswith(base_name):
+            return None
+        return self._by_collection_prefix.get(collection_name[:-len(base_name)])
+
+    def resolve(self, host: str, path: str) -> Tuple[Optional[Tenant], str]:
+        """Tenant for a request and the path with any tenant prefix removed.
+
+        ``/t/<tenant-id>/api/...`` selects a tenant explicitly; otherwise the
+        Host header is used. Returns None for an unknown explicit tenant.
+        """
+        if path.startswith(TENANT_PATH_PREFIX):
+            tenant_id, _, rest = path[len(TENANT_PATH_PREFIX):].partition("/")
+            return self._by_id.get(tenant_id), f"/{rest}"
+        return self.for_host(host), path
+
+    def email_service(self, tenant: Tenant) -> EmailService:
+        entry = self._email_services.get(tenant.id)
+        if entry is None:
+            settings = tenant.email_settings
+            entry = self._email_services[tenant.id] = (settings, email_service.with_overrides(**settings))
+        return entry[1]
+
+    def ensure_indexes(self, tenant: Tenant):
+        """Create a tenant's indexes in the background the first time it is seen"""
+        if tenant.id in self._indexed:
+            return
+        self._indexed.add(tenant.id)
+        lifecycle.spawn(self._ensure_indexes(tenant), name=f"tenant-indexes-{tenant.id}")
+
+    async def _ensure_indexes(self, tenant: Tenant):
+        try:
+            await ensure_tenant_indexes(tenant.collection_prefix)
+            # Plans explained before the indexes existed are stale now
+            query_guard.forget(tenant.collection_name("contact_messages"))
+        except Exception as e:
+            self._indexed.discard(tenant.id)
+            logger.error(f"Failed to ensure indexes for tenant {tenant.id}: {str(e)}")
+
+# Create global instance
+tenant_registry = TenantRegistry()
+
+_current_tenant: ContextVar[Optional[Tenant]] = ContextVar("current_tenant", default=None)
+
+def current_tenant() -> Tenant:
+    return _current_tenant.get() or tenant_registry.default
+
+def set_current_tenant(tenant: Tenant):
+    return _current_tenant.set(tenant)
+
+def reset_current_tenant(token):
+    _current_tenant.reset(token)
+
+def tenant_collection(name: str, tenant: Optional[Tenant] = None):
+    """The current (or given) tenant's copy of collection ``name``"""
+    return db[(tenant or current_tenant()).collection_name(name)]
+
+def tenant_email_service(tenant: Optional[Tenant] = None) -> EmailService:
+    return tenant_registry.email_service(tenant or current_tenant())
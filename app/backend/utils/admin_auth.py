@@ -0,0 +1,27 @@
+import hmac
+import os
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+class AdminAuth:
+    """Shared-secret check for admin-only endpoints.
+
+    Callers send ``ADMIN_API_TOKEN`` in an ``X-Admin-Token`` header. With no
+    token configured, every admin request is refused.
+    """
+
+    def __init__(self):
+        self.token = os.getenv('ADMIN_API_TOKEN') or None
+
+    def authorized(self, provided: Optional[str]) -> bool:
+        """Constant-time check of a caller-supplied admin token"""
+        return bool(self.token and provided) and hmac.compare_digest(provided.encode(), self.token.encode())
+
+# Create global instance
+admin_auth = AdminAuth()
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Route dependency rejecting requests without a valid admin token"""
+    if not admin_auth.authorized(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
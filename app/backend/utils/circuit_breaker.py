@@ -0,0 +1,137 @@
+import threading
+import time
+import logging
+from collections import deque
+from typing import Deque, Dict
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_breakers: Dict[str, "CircuitBreaker"] = {}
+
+class CircuitOpenError(Exception):
+    """A call was refused by an open (or busy half-open) circuit without being attempted"""
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker for calls to one remote dependency.
+
+    Outcomes of the last ``window_size`` calls are kept; once at least
+    ``minimum_calls`` have been seen and the share of failures reaches
+    ``failure_rate_threshold``, the circuit opens and ``allow()`` refuses
+    calls for ``open_seconds``. After that it goes half-open and lets up to
+    ``half_open_max_calls`` trial calls through: a success closes it again,
+    a failure reopens it. Safe to use from worker threads.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        minimum_calls: int = 5,
+        window_size: int = 20,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_calls = 0
+        _breakers[name] = self
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a trial call through"""
+        with self._lock:
+            if self._current_state() != OPEN:
+                return 0.0
+            return max(self._opened_at + self.open_seconds - time.monotonic(), 0.0)
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._trial_calls = 0
+            logger.info("Circuit %s half-open, allowing a trial call", self.name)
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead; every allowed call must be followed by one record_* call"""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._trial_calls < self.half_open_max_calls:
+                self._trial_calls += 1
+                return True
+        metrics.incr(f"circuit_{self.name}_rejected")
+        return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._outcomes.clear()
+                logger.info("Circuit %s closed after a successful trial call", self.name)
+                return
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._open("trial call failed")
+                return
+            self._outcomes.append(False)
+            if len(self._outcomes) >= self.minimum_calls and self._failure_rate() >= self.failure_rate_threshold:
+                self._open(f"{self._failure_rate():.0%} of the last {len(self._outcomes)} calls failed")
+
+    def _failure_rate(self) -> float:
+        return self._outcomes.count(False) / len(self._outcomes) if self._outcomes else 0.0
+
+    def _open(self, reason: str):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        metrics.incr(f"circuit_{self.name}_opened")
+        logger.warning("Circuit %s opened for %.0fs: %s", self.name, self.open_seconds, reason)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            state = self._current_state()
+            return {
+                "state": state,
+                "failure_rate": round(self._failure_rate(), 3),
+                "calls_in_window": len(self._outcomes),
+                "retry_after_seconds": round(max(self._opened_at + self.open_seconds - time.monotonic(), 0.0), 1) if state == OPEN else 0.0,
+            }
+
+def get_breaker(name: str, **settings) -> CircuitBreaker:
+    """The breaker registered under ``name``, created with ``settings`` on first use.
+
+    Callers guarding the same dependency share one breaker, so its state
+    survives the callers being rebuilt.
+    """
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = CircuitBreaker(name, **settings)
+    return breaker
+
+metrics.register_gauge("circuit_breakers", lambda: {name: breaker.snapshot() for name, breaker in list(_breakers.items())})
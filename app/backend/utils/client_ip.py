@@ -0,0 +1,69 @@
+import ipaddress
+import os
+import logging
+from typing import List, Optional, Union
+
+from starlette.requests import Request
+
+logger = logging.getLogger(__name__)
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+DEFAULT_TRUSTED_PROXIES = "127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16,fc00::/7"
+
+class ClientIPResolver:
+    """Works out the visitor's IP address behind the ingress.
+
+    ``X-Forwarded-For`` is only believed when the connection comes from a
+    proxy listed in ``TRUSTED_PROXIES`` (addresses or CIDR ranges). The
+    header is walked from the right, skipping further trusted hops, and the
+    first untrusted address is the client; entries left of it could have
+    been written by the client itself.
+    """
+
+    def __init__(self):
+        self.trusted_proxies = self._parse_networks(os.getenv('TRUSTED_PROXIES', DEFAULT_TRUSTED_PROXIES))
+
+    def _parse_networks(self, value: str) -> List[IPNetwork]:
+        networks = []
+        for entry in value.split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            try:
+                networks.append(ipaddress.ip_network(entry, strict=False))
+            except ValueError:
+                logger.error(f"Ignoring invalid TRUSTED_PROXIES entry: {entry}")
+        return networks
+
+    def is_trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+
+    def resolve(self, peer: Optional[str], forwarded_for: Optional[str]) -> Optional[str]:
+        """Client address for a connection from ``peer`` carrying ``forwarded_for``"""
+        if not peer or not forwarded_for or not self.is_trusted(peer):
+            return peer
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+        for hop in reversed(hops):
+            if not self.is_trusted(hop):
+                return hop if self._valid(hop) else peer
+        # Every hop is a trusted proxy; the leftmost is as close to the client as we get
+        return hops[0] if hops else peer
+
+    def _valid(self, address: str) -> bool:
+        try:
+            ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return True
+
+    def for_request(self, request: Request) -> Optional[str]:
+        peer = request.client.host if request.client else None
+        return self.resolve(peer, request.headers.get("x-forwarded-for"))
+
+# Create global instance
+client_ip = ClientIPResolver()
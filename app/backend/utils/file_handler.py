@@ -1,12 +1,24 @@
+import asyncio
 import os
 import uuid
-from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional, Tuple
 from fastapi import UploadFile
 import mimetypes
 import logging
 
+from utils.metrics import metrics
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is listed in requirements.txt
+    zstandard = None
+
 logger = logging.getLogger(__name__)
 
+COMPRESSED_SUFFIX = ".zst"
+CHUNK_SIZE = 64 * 1024
+
 class FileHandler:
     def __init__(self, upload_dir: str = "/app/backend/uploads"):
         self.upload_dir = upload_dir
@@ -22,6 +34,21 @@ class FileHandler:
             'image/jpg'
         }
         
+        # Transparent zstd compression of stored blobs
+        self.compression_enabled = zstandard is not None and os.getenv('ATTACHMENT_COMPRESSION_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+        self.compression_level = int(os.getenv('ATTACHMENT_COMPRESSION_LEVEL', '3'))
+        # Only keep the compressed copy when it is at most this fraction of the original
+        self.compression_max_ratio = float(os.getenv('ATTACHMENT_COMPRESSION_MAX_RATIO', '0.9'))
+        self.compression_sample_size = int(os.getenv('ATTACHMENT_COMPRESSION_SAMPLE_BYTES', str(CHUNK_SIZE)))
+        # Formats that are already compressed internally
+        self.incompressible_mime_types = {
+            'image/png',
+            'image/jpeg',
+            'image/jpg',
+            'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+        }
+        self._compression_pool: Optional[ThreadPoolExecutor] = None
+        
         # Create upload directory if it doesn't exist
         os.makedirs(upload_dir, exist_ok=True)
     
@@ -66,19 +93,86 @@ class FileHandler:
                 content = file.file.read()
                 buffer.write(content)
             
-            logger.info(f"File saved successfully: {file_path}")
+            logger.info("File saved successfully: %s", file_path)
             return True, "File saved successfully", file_path
             
         except Exception as e:
             logger.error(f"File save error: {str(e)}")
             return False, f"Failed to save file: {str(e)}", None
     
+    async def compress_stored(self, file_path: str, mime_type: Optional[str]) -> Tuple[str, int, Optional[str]]:
+        """Compress a saved file in the worker pool when that saves space.
+
+        Returns the path now holding the blob, its size on disk and the
+        compression used (None when the file was kept as is).
+        """
+        original_size = os.path.getsize(file_path)
+        if not self.compression_enabled or mime_type in self.incompressible_mime_types:
+            self._record_storage(original_size, original_size)
+            return file_path, original_size, None
+        
+        if self._compression_pool is None:
+            self._compression_pool = ThreadPoolExecutor(
+                max_workers=int(os.getenv('ATTACHMENT_COMPRESSION_WORKERS', '2')),
+                thread_name_prefix="attachment-compress"
+            )
+        loop = asyncio.get_running_loop()
+        try:
+            stored_path, stored_size, compression = await loop.run_in_executor(
+                self._compression_pool, self._compress_file, file_path, original_size
+            )
+        except Exception as e:
+            logger.error(f"Attachment compression error: {str(e)}")
+            stored_path, stored_size, compression = file_path, original_size, None
+        
+        self._record_storage(original_size, stored_size)
+        return stored_path, stored_size, compression
+    
+    def _compress_file(self, file_path: str, original_size: int) -> Tuple[str, int, Optional[str]]:
+        compressor = zstandard.ZstdCompressor(level=self.compression_level)
+        
+        # Estimate the ratio from a sample before compressing the whole file
+        with open(file_path, "rb") as source:
+            sample = source.read(self.compression_sample_size)
+        if not sample or len(compressor.compress(sample)) > len(sample) * self.compression_max_ratio:
+            return file_path, original_size, None
+        
+        compressed_path = file_path + COMPRESSED_SUFFIX
+        with open(file_path, "rb") as source, open(compressed_path, "wb") as target:
+            compressor.copy_stream(source, target, size=original_size, read_size=CHUNK_SIZE, write_size=CHUNK_SIZE)
+        
+        compressed_size = os.path.getsize(compressed_path)
+        if compressed_size > original_size * self.compression_max_ratio:
+            os.remove(compressed_path)
+            return file_path, original_size, None
+        
+        os.remove(file_path)
+        return compressed_path, compressed_size, "zstd"
+    
+    def _record_storage(self, original_size: int, stored_size: int):
+        metrics.incr("attachment_bytes_original", original_size)
+        metrics.incr("attachment_bytes_stored", stored_size)
+        metrics.incr("attachment_bytes_saved", original_size - stored_size)
+    
+    def iter_file(self, file_path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Stream a stored attachment's original bytes, decompressing on the fly"""
+        with open(file_path, "rb") as source:
+            if file_path.endswith(COMPRESSED_SUFFIX):
+                reader = zstandard.ZstdDecompressor().stream_reader(source, read_size=chunk_size)
+            else:
+                reader = source
+            while True:
+                chunk = reader.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    
     def delete_file(self, file_path: str) -> bool:
         """Delete a file"""
         try:
             if os.path.exists(file_path):
                 os.remove(file_path)
-                logger.info(f"File deleted successfully: {file_path}")
+                logger.info("File deleted successfully: %s", file_path)
                 return True
             return False
         except Exception as e:
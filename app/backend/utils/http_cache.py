@@ -0,0 +1,48 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from database import db
+
+COUNTERS_COLLECTION = "counters"
+
+async def bump_write_generation(collection: str):
+    """Record that ``collection`` changed, invalidating ETags derived from it"""
+    await db[COUNTERS_COLLECTION].update_one(
+        {"_id": collection},
+        {"$inc": {"generation": 1}},
+        upsert=True
+    )
+
+async def get_write_generation(collection: str) -> int:
+    counter = await db[COUNTERS_COLLECTION].find_one({"_id": collection})
+    return counter.get("generation", 0) if counter else 0
+
+def compute_etag(*parts: Any) -> str:
+    """Weak ETag over the given validator parts.
+
+    Weak so the same tag stays valid for every Content-Encoding of a response.
+    """
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of ``etag`` against the request's If-None-Match header"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,138 @@
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from utils.metrics import metrics
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line; runs on the listener thread, never on the event loop"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class SamplingFilter(logging.Filter):
+    """Keeps 1 in N records at INFO and below for selected loggers.
+
+    ``rates`` maps a logger name (or dotted prefix) to N. Warnings and errors
+    are always kept.
+    """
+
+    def __init__(self, rates: Dict[str, int]):
+        super().__init__()
+        self.rates = rates
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _rate_for(self, name: str) -> int:
+        while name:
+            rate = self.rates.get(name)
+            if rate is not None:
+                return rate
+            name = name.rpartition(".")[0]
+        return 1
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        rate = self._rate_for(record.name)
+        if rate <= 1:
+            return True
+        with self._lock:
+            count = self._counters.get(record.name, 0)
+            self._counters[record.name] = count + 1
+        if count % rate == 0:
+            return True
+        metrics.incr("log_records_sampled_out")
+        return False
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records without blocking; when the queue is full the record is dropped and counted"""
+
+    _exception_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Freeze the record before it crosses threads, as QueueHandler does.
+
+        ``args`` may be mutable objects the caller keeps changing, so the
+        message and traceback are rendered now; only the output line is
+        formatted on the listener thread.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.incr("log_records_dropped")
+
+def _parse_sample_rates(value: str) -> Dict[str, int]:
+    """Parse "logger.name=N,other=M" into {name: N}"""
+    rates = {}
+    for item in value.split(","):
+        name, _, rate = item.strip().partition("=")
+        if name and rate.strip().isdigit():
+            rates[name.strip()] = max(int(rate), 1)
+    return rates
+
+def configure_logging(
+    level: Optional[str] = None,
+    queue_size: Optional[int] = None,
+    sample_rates: Optional[Dict[str, int]] = None
+) -> logging.handlers.QueueListener:
+    """Route all logging through a bounded queue drained by a background thread.
+
+    Returns the started listener; call ``stop()`` on shutdown to flush it.
+    """
+    level = level or os.getenv('LOG_LEVEL', 'INFO')
+    queue_size = queue_size or int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    if sample_rates is None:
+        sample_rates = _parse_sample_rates(os.getenv('LOG_SAMPLE_RATES', ''))
+
+    output = logging.StreamHandler(sys.stderr)
+    if os.getenv('LOG_FORMAT', 'json').lower() == 'json':
+        output.setFormatter(JSONFormatter())
+    else:
+        output.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    if sample_rates:
+        queue_handler.addFilter(SamplingFilter(sample_rates))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    metrics.register_gauge("log_queue_depth", log_queue.qsize)
+
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    return listener
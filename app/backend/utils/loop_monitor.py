@@ -0,0 +1,157 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+import logging
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = str(Path(__file__).resolve().parent.parent)
+MAX_TRACKED_SITES = 200
+STACK_DEPTH = 15
+
+class LoopLagMonitor:
+    """Measures event-loop lag continuously and pins long stalls on the code that caused them.
+
+    A monitor task sleeps for ``interval`` and records how late it wakes up.
+    A watchdog thread checks the task's heartbeat; when the loop has not
+    come back for longer than ``threshold``, it captures the loop thread's
+    stack while the blocking call is still running. The stall is attributed
+    to the innermost frame inside the backend (e.g. the handler line calling
+    smtplib), so repeated offenders add up under one call site.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv('LOOP_MONITOR_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+        self.interval = float(os.getenv('LOOP_MONITOR_INTERVAL_MS', '100')) / 1000.0
+        self.threshold = float(os.getenv('LOOP_BLOCK_THRESHOLD_MS', '250')) / 1000.0
+        self.samples: Deque[float] = deque(maxlen=int(os.getenv('LOOP_MONITOR_SAMPLES', '1200')))
+        self.blocks_total = 0
+        self.recent_blocks: Deque[dict] = deque(maxlen=20)
+        self._sites: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._pending: Optional[Tuple[str, List[str]]] = None
+        self._heartbeat = time.monotonic()
+        self._captured_heartbeat: Optional[float] = None
+        self._thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self):
+        if not self.enabled or self._task is not None:
+            return
+        self._thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stop.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - started - self.interval, 0.0)
+            self._heartbeat = time.monotonic()
+            self.samples.append(lag)
+            if lag >= self.threshold:
+                self._record_block(lag)
+
+    def _watch(self):
+        while not self._stop.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            if time.monotonic() - heartbeat < self.interval + self.threshold:
+                continue
+            if self._captured_heartbeat == heartbeat:
+                continue
+            self._captured_heartbeat = heartbeat
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            with self._lock:
+                self._pending = (self._call_site(stack), traceback.format_list(stack[-STACK_DEPTH:]))
+
+    def _call_site(self, stack: traceback.StackSummary) -> str:
+        for entry in reversed(stack):
+            if entry.filename.startswith(BACKEND_DIR) and entry.filename != __file__:
+                return f"{os.path.relpath(entry.filename, BACKEND_DIR)}:{entry.lineno} in {entry.name}"
+        entry = stack[-1]
+        return f"{entry.filename}:{entry.lineno} in {entry.name}"
+
+    def _record_block(self, lag: float):
+        with self._lock:
+            pending, self._pending = self._pending, None
+        site, stack = pending if pending else ("unknown (loop recovered before the watchdog sampled it)", [])
+        lag_ms = lag * 1000
+
+        self.blocks_total += 1
+        stats = self._sites.get(site)
+        first_seen = stats is None
+        if first_seen:
+            if len(self._sites) >= MAX_TRACKED_SITES:
+                # Make room by forgetting the site with the least blocked time
+                del self._sites[min(self._sites, key=lambda key: self._sites[key]["total_ms"])]
+            stats = self._sites[site] = {"site": site, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "stack": stack}
+        stats["count"] += 1
+        stats["total_ms"] += lag_ms
+        stats["max_ms"] = max(stats["max_ms"], lag_ms)
+        if stack:
+            stats["stack"] = stack
+        self.recent_blocks.append({"at": datetime.utcnow(), "lag_ms": round(lag_ms, 1), "site": site})
+
+        if first_seen and stack:
+            logger.warning("Event loop blocked for %.0fms at %s\n%s", lag_ms, site, "".join(stack))
+        else:
+            logger.warning("Event loop blocked for %.0fms at %s", lag_ms, site)
+
+    def percentiles(self) -> dict:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+
+        def at(fraction: float) -> float:
+            return round(ordered[min(int(fraction * len(ordered)), len(ordered) - 1)] * 1000, 2)
+
+        return {"p50": at(0.5), "p90": at(0.9), "p99": at(0.99), "max": round(ordered[-1] * 1000, 2)}
+
+    def report(self, top: int = 10) -> dict:
+        sites = sorted(self._sites.values(), key=lambda stats: stats["total_ms"], reverse=True)[:top]
+        return {
+            "enabled": self.enabled and self._task is not None,
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "samples": len(self.samples),
+            "lag_ms": self.percentiles(),
+            "blocks_total": self.blocks_total,
+            "top_sites": [
+                {**stats, "total_ms": round(stats["total_ms"], 1), "max_ms": round(stats["max_ms"], 1)}
+                for stats in sites
+            ],
+            "recent_blocks": list(self.recent_blocks),
+        }
+
+# Create global instance
+loop_monitor = LoopLagMonitor()
+metrics.register_gauge("event_loop_lag_p99_ms", lambda: loop_monitor.percentiles()["p99"])
+metrics.register_gauge("event_loop_blocks", lambda: loop_monitor.blocks_total)
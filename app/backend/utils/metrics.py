@@ -0,0 +1,36 @@
+import threading
+from collections import defaultdict
+from typing import Callable, Dict
+
+class Metrics:
+    """In-process counters and gauges exposed through GET /api/metrics.
+
+    Counters are incremented from any thread; gauges are callables evaluated
+    when a snapshot is taken.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._gauges: Dict[str, Callable[[], object]] = {}
+
+    def incr(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def register_gauge(self, name: str, func: Callable[[], object]):
+        self._gauges[name] = func
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        gauges = {}
+        for name, func in self._gauges.items():
+            try:
+                gauges[name] = func()
+            except Exception:
+                gauges[name] = None
+        return {"counters": counters, "gauges": gauges}
+
+# Create global instance
+metrics = Metrics()
@@ -0,0 +1,188 @@
+import asyncio
+import hmac
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile-token"
+PROFILE_SUFFIX = ".collapsed"
+_UNSAFE_NAME_RE = re.compile(r"[^A-Za-z0-9_-]+")
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval from a helper thread.
+
+    Samples are aggregated as collapsed stacks (``root;...;leaf count``), the
+    input format of flamegraph.pl, speedscope and similar tools. Profiling
+    the event loop thread also captures concurrent requests and idle time in
+    the selector; the leaf frames make those easy to tell apart.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+def render_collapsed(stacks: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+class ProfileStore:
+    """Writes collapsed-stack profiles to a directory that keeps only the newest ``max_files``"""
+
+    def __init__(self, directory: str, max_files: int):
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def save(self, name: str, stacks: Counter) -> Path:
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{name}{PROFILE_SUFFIX}"
+            path.write_text(render_collapsed(stacks), encoding="utf-8")
+            self._rotate()
+        return path
+
+    def path_for(self, filename: str) -> Optional[Path]:
+        if not filename.endswith(PROFILE_SUFFIX) or os.path.basename(filename) != filename:
+            return None
+        path = self.directory / filename
+        return path if path.is_file() else None
+
+    def _rotate(self):
+        profiles = sorted(self.directory.glob(f"*{PROFILE_SUFFIX}"), key=lambda p: p.stat().st_mtime)
+        for path in profiles[:max(len(profiles) - self.max_files, 0)]:
+            try:
+                path.unlink()
+            except OSError as e:
+                logger.error(f"Failed to remove old profile {path}: {str(e)}")
+
+class Profiler:
+    """Profiling settings from the environment and the store profiles are written to"""
+
+    def __init__(self):
+        self.token = os.getenv('PROFILING_TOKEN') or None
+        self.sample_every = int(os.getenv('PROFILE_SAMPLE_EVERY_N', '0'))
+        self.interval = float(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', '2')) / 1000.0
+        self.sampled_routes = set()
+        for route in os.getenv('PROFILE_SAMPLED_ROUTES', 'POST /api/contact').split(','):
+            method, _, path = route.strip().partition(' ')
+            if method and path:
+                self.sampled_routes.add((method.upper(), path.strip()))
+        self.store = ProfileStore(
+            os.getenv('PROFILE_DIR', str(Path(__file__).resolve().parent.parent / "profiles")),
+            int(os.getenv('PROFILE_MAX_FILES', '50'))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.token is not None or self.sample_every > 0
+
+    def authorized(self, provided: Optional[str]) -> bool:
+        """Constant-time check of a caller-supplied profiling token"""
+        return bool(self.token and provided) and hmac.compare_digest(provided.encode(), self.token.encode())
+
+class ProfilingMiddleware:
+    """Runs selected requests under a sampling profiler.
+
+    A request carrying the configured ``PROFILING_TOKEN`` in the
+    ``X-Profile-Token`` header is always profiled; the token is never taken
+    from the query string, where it would end up in access logs. Requests to the sampled routes are also profiled one in
+    every ``PROFILE_SAMPLE_EVERY_N`` times, as long as no other profile is
+    running. Profiles are written to the rotating profile directory once the
+    handler finishes and the file name is returned in an ``X-Profile-File``
+    header.
+    """
+
+    def __init__(self, app: ASGIApp, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+        self._counter = itertools.count(1)
+        self._active = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        reason = self._profile_reason(scope)
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        name = self._profile_name(scope, reason)
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(raw=message["headers"])
+                headers["X-Profile-File"] = f"{name}{PROFILE_SUFFIX}"
+                # A profiled response is a one-off and must not be served from shared caches
+                headers["Cache-Control"] = "no-store"
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident(), self.profiler.interval)
+        self._active += 1
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            stacks = await asyncio.to_thread(sampler.stop)
+            self._active -= 1
+            try:
+                await asyncio.to_thread(self.profiler.store.save, name, stacks)
+                metrics.incr("profiles_captured")
+                logger.info("Saved %s profile %s (status %d, %d samples)", reason, name, status_code, sum(stacks.values()))
+            except Exception as e:
+                logger.error(f"Failed to save profile {name}: {str(e)}")
+
+    def _profile_reason(self, scope: Scope) -> Optional[str]:
+        if self.profiler.authorized(Headers(scope=scope).get(PROFILE_HEADER)):
+            return "requested"
+
+        if self.profiler.sample_every > 0 and (scope["method"], scope["path"]) in self.profiler.sampled_routes:
+            if next(self._counter) % self.profiler.sample_every == 0 and self._active == 0:
+                return "sampled"
+        return None
+
+    def _profile_name(self, scope: Scope, reason: str) -> str:
+        route = _UNSAFE_NAME_RE.sub("_", scope["path"]).strip("_") or "root"
+        return f"{time.strftime('%Y%m%dT%H%M%S')}-{time.time_ns() % 1_000_000_000:09d}-{reason}-{scope['method']}-{route}"
+
+# Create global instance
+profiler = Profiler()
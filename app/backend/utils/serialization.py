@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import Any, Iterable, Mapping, Union
+import json
+
+from fastapi.responses import Response
+
+from models.contact import CONTACT_ADMIN_FIELDS, CONTACT_PUBLIC_FIELDS
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements.txt
+    orjson = None
+
+def _default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def public_contact(document: Mapping[str, Any], fields: Mapping[str, Any] = CONTACT_PUBLIC_FIELDS) -> dict:
+    """Project a contact_messages document onto the public response fields"""
+    return {name: document.get(name, default) for name, default in fields.items()}
+
+def admin_contact(document: Mapping[str, Any]) -> dict:
+    """Project a contact_messages document onto the admin response fields"""
+    return public_contact(document, CONTACT_ADMIN_FIELDS)
+
+class ContactJSONResponse(Response):
+    """Renders contact_messages documents straight to JSON bytes.
+
+    Accepts a single document or a list of documents as stored in Mongo and
+    projects them onto the ``ContactFormResponse`` fields while serializing,
+    so no intermediate response models are built on the hot path.
+    """
+
+    media_type = "application/json"
+    fields: Mapping[str, Any] = CONTACT_PUBLIC_FIELDS
+
+    def render(self, content: Union[Mapping[str, Any], Iterable[Mapping[str, Any]], bytes]) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if isinstance(content, Mapping):
+            return dumps(public_contact(content, self.fields))
+        return dumps([public_contact(document, self.fields) for document in content])
+
+class AdminContactJSONResponse(ContactJSONResponse):
+    """ContactJSONResponse projected onto the ``ContactMessageAdminResponse`` fields"""
+
+    fields = CONTACT_ADMIN_FIELDS
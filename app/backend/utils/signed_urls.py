@@ -0,0 +1,47 @@
+import hashlib
+import hmac
+import os
+import time
+import logging
+from typing import Optional
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+class AttachmentLinkSigner:
+    """Builds and checks expiring HMAC-signed links to the attachment download endpoint.
+
+    The signature covers the tenant, message id and expiry, so a link cannot
+    be reused for another message or extended. Links are only issued when
+    ``ATTACHMENT_LINK_SECRET`` is set; every worker must share the secret.
+    """
+
+    def __init__(self):
+        secret = os.getenv('ATTACHMENT_LINK_SECRET')
+        self.secret = secret.encode("utf-8") if secret else None
+        self.ttl = int(os.getenv('ATTACHMENT_LINK_TTL_SECONDS', str(7 * 24 * 3600)))
+        self.base_url = os.getenv('PUBLIC_API_URL', 'http://localhost:8001').rstrip('/')
+
+    @property
+    def enabled(self) -> bool:
+        return self.secret is not None
+
+    def signature(self, tenant_id: str, message_id: str, expires: int) -> str:
+        payload = f"{tenant_id}\n{message_id}\n{expires}".encode("utf-8")
+        return hmac.new(self.secret, payload, hashlib.sha256).hexdigest()
+
+    def link(self, tenant_id: str, message_id: str, path_prefix: str = "") -> Optional[str]:
+        """Signed download URL for a message's attachment, or None when signing is not configured"""
+        if not self.enabled:
+            return None
+        expires = int(time.time()) + self.ttl
+        query = urlencode({"expires": expires, "signature": self.signature(tenant_id, message_id, expires)})
+        return f"{self.base_url}{path_prefix}/api/contact/{message_id}/attachment?{query}"
+
+    def verify(self, tenant_id: str, message_id: str, expires: int, signature: str) -> bool:
+        if not self.enabled or expires < time.time():
+            return False
+        return hmac.compare_digest(self.signature(tenant_id, message_id, expires), signature)
+
+# Create global instance
+attachment_links = AttachmentLinkSigner()
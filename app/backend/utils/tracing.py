@@ -0,0 +1,199 @@
+import contextlib
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+import logging
+import urllib.request
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+class Trace:
+    """Span timings collected for one request"""
+
+    __slots__ = ("trace_id", "name", "start_ns", "start_perf", "spans")
+
+    def __init__(self, name: str):
+        self.trace_id = secrets.token_hex(16)
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.start_perf = time.perf_counter()
+        self.spans: List[Tuple[str, float, float]] = []
+
+    def record(self, name: str, start: float, end: float):
+        self.spans.append((name, start, end))
+
+    def server_timing(self, end: float) -> str:
+        entries = [f"{name};dur={(stop - start) * 1000:.2f}" for name, start, stop in self.spans]
+        entries.append(f"total;dur={(end - self.start_perf) * 1000:.2f}")
+        return ", ".join(entries)
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_NOOP_SPAN = contextlib.nullcontext()
+
+class _Span:
+    __slots__ = ("trace", "name", "start")
+
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.trace.record(self.name, self.start, time.perf_counter())
+        return False
+
+def span(name: str):
+    """Time a block as a phase of the current request; a shared no-op when tracing is off"""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return _Span(trace, name)
+
+def mark_since_request_start(name: str):
+    """Record a span from the start of the request until now, e.g. body parsing before the handler runs"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record(name, trace.start_perf, time.perf_counter())
+
+class OTLPExporter:
+    """Ships finished traces to an OTLP/HTTP JSON collector from a background thread.
+
+    Traces are queued without blocking (and dropped when the queue is full),
+    then posted in batches.
+    """
+
+    def __init__(self, endpoint: str, service_name: str = "portfolio-api", batch_size: int = 64, queue_size: int = 2048):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.timeout = float(os.getenv('OTLP_TIMEOUT_SECONDS', '2'))
+        self._queue: "queue.Queue[Optional[Tuple[Trace, float, int]]]" = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, trace: Trace, end: float, status_code: int):
+        try:
+            self._queue.put_nowait((trace, end, status_code))
+        except queue.Full:
+            pass
+
+    def shutdown(self):
+        self._queue.put(None)
+        self._thread.join(timeout=self.timeout + 1)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._post(batch)
+                    return
+                batch.append(item)
+            self._post(batch)
+
+    def _to_ns(self, trace: Trace, perf: float) -> str:
+        return str(trace.start_ns + int((perf - trace.start_perf) * 1e9))
+
+    def _post(self, batch):
+        spans = []
+        for trace, end, status_code in batch:
+            root_id = secrets.token_hex(8)
+            spans.append({
+                "traceId": trace.trace_id,
+                "spanId": root_id,
+                "name": trace.name,
+                "kind": 2,
+                "startTimeUnixNano": str(trace.start_ns),
+                "endTimeUnixNano": self._to_ns(trace, end),
+                "attributes": [{"key": "http.status_code", "value": {"intValue": status_code}}],
+            })
+            for name, start, stop in trace.spans:
+                spans.append({
+                    "traceId": trace.trace_id,
+                    "spanId": secrets.token_hex(8),
+                    "parentSpanId": root_id,
+                    "name": name,
+                    "kind": 1,
+                    "startTimeUnixNano": self._to_ns(trace, start),
+                    "endTimeUnixNano": self._to_ns(trace, stop),
+                })
+
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": "portfolio-api"}, "spans": spans}],
+            }]
+        }
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout):
+                pass
+        except Exception as e:
+            logger.warning(f"Failed to export {len(batch)} traces to {self.endpoint}: {str(e)}")
+
+class TracingMiddleware:
+    """Starts a trace per HTTP request and reports its spans in a Server-Timing header.
+
+    Spans recorded before the response starts are included in the header;
+    the complete trace is handed to the exporter, if any, once the response
+    has been sent.
+    """
+
+    def __init__(self, app: ASGIApp, exporter: Optional[OTLPExporter] = None):
+        self.app = app
+        self.exporter = exporter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(f"{scope['method']} {scope['path']}")
+        token = _current_trace.set(trace)
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(raw=message["headers"])
+                headers.append("Server-Timing", trace.server_timing(time.perf_counter()))
+                headers["Timing-Allow-Origin"] = "*"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_trace.reset(token)
+            if self.exporter is not None:
+                self.exporter.submit(trace, time.perf_counter(), status_code)
+
+def tracing_enabled() -> bool:
+    return os.getenv('TRACING_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+
+def create_exporter() -> Optional[OTLPExporter]:
+    endpoint = os.getenv('OTLP_ENDPOINT')
+    return OTLPExporter(endpoint) if endpoint else None
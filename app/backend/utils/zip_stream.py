@@ -0,0 +1,59 @@
+import time
+import zipfile
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+class _ChunkBuffer:
+    """Write-only, unseekable sink; zipfile falls back to data descriptors for it"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+class ZipStreamWriter:
+    """Builds a ZIP archive incrementally and hands back its bytes as they are produced.
+
+    Nothing is written to disk and at most one input chunk's worth of output
+    is buffered, so an archive of any size streams in constant memory.
+    """
+
+    def __init__(self, compresslevel: int = 6):
+        self._buffer = _ChunkBuffer()
+        self._zip = zipfile.ZipFile(self._buffer, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+
+    def add_file(
+        self,
+        arcname: str,
+        chunks: Iterable[bytes],
+        compress: bool = True,
+        date_time: Optional[Tuple[int, int, int, int, int, int]] = None
+    ) -> Iterator[bytes]:
+        """Add one entry from a chunk iterator, yielding archive bytes along the way"""
+        info = zipfile.ZipInfo(arcname, date_time or time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        info.external_attr = 0o644 << 16
+        with self._zip.open(info, "w") as entry:
+            for chunk in chunks:
+                entry.write(chunk)
+                data = self._buffer.take()
+                if data:
+                    yield data
+        yield self._buffer.take()
+
+    def add_bytes(self, arcname: str, data: bytes) -> bytes:
+        return b"".join(self.add_file(arcname, [data]))
+
+    def close(self) -> bytes:
+        """Write the central directory and return the final bytes"""
+        self._zip.close()
+        return self._buffer.take()
@@ -18,6 +18,10 @@ class BackendTester:
         self.base_url = self._get_backend_url()
         self.api_url = f"{self.base_url}/api"
         self.session = requests.Session()
+        # Listing messages is admin-only; use the same token as the backend
+        admin_token = os.getenv('ADMIN_API_TOKEN')
+        if admin_token:
+            self.session.headers["X-Admin-Token"] = admin_token
         self.test_results = {}
         
     def _get_backend_url(self) -> str:
@@ -1,122 +0,0 @@
-export const projects = [
-  {
-    id: 1,
-    title: "Sales Dashboard with Power BI",
-    description: "Interactive sales analytics dashboard tracking KPIs, revenue trends, and performance metrics across multiple regions and time periods.",
-    longDescription: "Developed a comprehensive sales dashboard using Power BI that provides real-time insights into sales performance across different regions, products, and time periods. The dashboard includes interactive visualizations for revenue trends, top-performing products, sales rep performance, and predictive analytics for future sales forecasting. Features drill-down capabilities, automated data refresh, and mobile-responsive design for executive access.",
-    technologies: ["Power BI", "SQL Server", "DAX", "Excel"],
-    category: "Data Visualization",
-    image: "https://images.unsplash.com/photo-1551288049-bebda4e38f71?w=800&h=600&fit=crop",
-    demoUrl: "#",
-    githubUrl: "#",
-    featured: true,
-    completedAt: "2024-01-15"
-  },
-  {
-    id: 2,
-    title: "Market Trends Analysis with Python & SQL",
-    description: "Comprehensive market analysis using Python and SQL to identify trends, patterns, and opportunities in financial markets.",
-    longDescription: "Conducted in-depth market analysis using Python for data processing and SQL for database querying. The project involved analyzing historical market data, identifying seasonal patterns, correlation analysis between different market sectors, and building predictive models for trend forecasting. Implemented automated data pipeline for real-time market data ingestion and processing.",
-    technologies: ["Python", "SQL", "Pandas", "NumPy", "Matplotlib", "Seaborn"],
-    category: "Data Analysis",
-    image: "https://images.unsplash.com/photo-1611974789855-9c2a0a7236a3?w=800&h=600&fit=crop",
-    demoUrl: "#",
-    githubUrl: "#",
-    featured: true,
-    completedAt: "2024-02-20"
-  },
-  {
-    id: 3,
-    title: "Customer Segmentation with Machine Learning",
-    description: "ML-powered customer segmentation system to identify distinct customer groups and personalize marketing strategies.",
-    longDescription: "Built a comprehensive customer segmentation system using machine learning algorithms including K-means clustering, hierarchical clustering, and RFM analysis. The system processes customer transaction data, demographic information, and behavioral patterns to create meaningful customer segments. Implemented automated scoring system for customer lifetime value prediction and churn risk assessment.",
-    technologies: ["Python", "Scikit-learn", "Pandas", "Jupyter", "MySQL"],
-    category: "Machine Learning",
-    image: "https://images.unsplash.com/photo-1460925895917-afdab827c52f?w=800&h=600&fit=crop",
-    demoUrl: "#",
-    githubUrl: "#",
-    featured: true,
-    completedAt: "2024-03-10"
-  },
-  {
-    id: 4,
-    title: "Interactive Web Dashboard in React",
-    description: "Modern, responsive web dashboard built with React for real-time data visualization and business intelligence.",
-    longDescription: "Developed a full-stack web dashboard using React, Node.js, and MongoDB for real-time business intelligence. The dashboard features interactive charts, real-time data updates, user authentication, and role-based access control. Implemented responsive design with dark/light theme support, data export functionality, and automated report generation.",
-    technologies: ["React", "Node.js", "MongoDB", "Chart.js", "Tailwind CSS"],
-    category: "Web Development",
-    image: "https://images.unsplash.com/photo-1551650975-87deedd944c3?w=800&h=600&fit=crop",
-    demoUrl: "#",
-    githubUrl: "#",
-    featured: false,
-    completedAt: "2024-04-05"
-  },
-  {
-    id: 5,
-    title: "E-commerce Analytics Platform",
-    description: "End-to-end analytics platform for e-commerce businesses with advanced reporting and predictive analytics.",
-    longDescription: "Created a comprehensive e-commerce analytics platform that tracks user behavior, conversion rates, product performance, and revenue metrics. The platform includes advanced features like cohort analysis, funnel visualization, A/B testing results, and predictive modeling for inventory management and demand forecasting.",
-    technologies: ["Python", "Django", "PostgreSQL", "Redis", "Celery", "React"],
-    category: "Web Development",
-    image: "https://images.unsplash.com/photo-1563013544-824ae1b704d3?w=800&h=600&fit=crop",
-    demoUrl: "#",
-    githubUrl: "#",
-    featured: false,
-    completedAt: "2024-05-18"
-  }
-];
-
-export const skills = [
-  { name: "Python", level: 90, category: "Programming" },
-  { name: "SQL", level: 85, category: "Database" },
-  { name: "React", level: 80, category: "Frontend" },
-  { name: "Power BI", level: 88, category: "Visualization" },
-  { name: "Machine Learning", level: 82, category: "Data Science" },
-  { name: "JavaScript", level: 75, category: "Programming" },
-  { name: "MongoDB", level: 70, category: "Database" },
-  { name: "Tableau", level: 85, category: "Visualization" },
-  { name: "R", level: 65, category: "Programming" },
-  { name: "Docker", level: 60, category: "DevOps" }
-];
-
-export const experiences = [
-  {
-    id: 1,
-    title: "Senior Data Analyst",
-    company: "TechCorp Solutions",
-    period: "2022 - Present",
-    description: "Leading data analytics initiatives and building comprehensive dashboards for business intelligence."
-  },
-  {
-    id: 2,
-    title: "Data Analyst",
-    company: "DataFlow Inc.",
-    period: "2020 - 2022",
-    description: "Developed automated reporting systems and performed statistical analysis for business optimization."
-  },
-  {
-    id: 3,
-    title: "Junior Developer",
-    company: "WebTech Startup",
-    period: "2019 - 2020",
-    description: "Built responsive web applications and implemented data visualization solutions."
-  }
-];
-
-export const socialLinks = [
-  {
-    name: "LinkedIn",
-    url: "https://www.linkedin.com/in/shubham-kadam-52511325b/",
-    icon: "linkedin"
-  },
-  {
-    name: "GitHub",
-    url: "https://github.com/shubhaammm08",
-    icon: "github"
-  },
-  {
-    name: "Kaggle",
-    url: "https://kaggle.com/shubhamkadam",
-    icon: "kaggle"
-  }
-];
\ No newline at end of file
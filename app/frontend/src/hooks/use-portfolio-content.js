@@ -0,0 +1,44 @@
+import { useEffect, useState } from "react"
+
+// Content responses are shared across pages for the lifetime of the tab
+const cache = new Map()
+const inflight = new Map()
+
+const fetchContent = (path) => {
+  if (!inflight.has(path)) {
+    const request = fetch(`${process.env.REACT_APP_BACKEND_URL}/api/${path}`)
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error(`Failed to load ${path}`)
+        }
+        return response.json()
+      })
+      .then((data) => {
+        cache.set(path, data)
+        return data
+      })
+      .finally(() => inflight.delete(path))
+    inflight.set(path, request)
+  }
+  return inflight.get(path)
+}
+
+export function usePortfolioContent(path) {
+  const [data, setData] = useState(() => cache.get(path) || [])
+
+  useEffect(() => {
+    let active = true
+    fetchContent(path)
+      .then((result) => {
+        if (active) {
+          setData(result)
+        }
+      })
+      .catch((error) => console.error(error))
+    return () => {
+      active = false
+    }
+  }, [path])
+
+  return data
+}
@@ -3,10 +3,13 @@ import { motion } from 'framer-motion';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
 import { Badge } from '../components/ui/badge';
 import { Progress } from '../components/ui/progress';
-import { skills, experiences } from '../data/mockData';
+import { usePortfolioContent } from '../hooks/use-portfolio-content';
 import { User, Briefcase, Award, Calendar } from 'lucide-react';
 
 const About = () => {
+  const skills = usePortfolioContent('skills');
+  const experiences = usePortfolioContent('experiences');
+
   const containerVariants = {
     hidden: { opacity: 0 },
     visible: {
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import { motion } from 'framer-motion';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
 import { Button } from '../components/ui/button';
@@ -7,7 +7,7 @@ import { Textarea } from '../components/ui/textarea';
 import { Label } from '../components/ui/label';
 import { Badge } from '../components/ui/badge';
 import { useToast } from '../hooks/use-toast';
-import { socialLinks } from '../data/mockData';
+import { usePortfolioContent } from '../hooks/use-portfolio-content';
 import { 
   Mail, 
   Phone, 
@@ -24,6 +24,7 @@ import {
 } from 'lucide-react';
 
 const Contact = () => {
+  const socialLinks = usePortfolioContent('social-links');
   const [formData, setFormData] = useState({
     name: '',
     email: '',
@@ -33,6 +34,8 @@ const Contact = () => {
   });
   const [isSubmitting, setIsSubmitting] = useState(false);
   const [errors, setErrors] = useState({});
+  const formStartedAt = useRef(Date.now());
+  const honeypotRef = useRef(null);
   const { toast } = useToast();
 
   const KaggleIcon = () => (
@@ -132,6 +135,8 @@ const Contact = () => {
       formDataToSend.append('email', formData.email);
       formDataToSend.append('subject', formData.subject);
       formDataToSend.append('message', formData.message);
+      formDataToSend.append('website', honeypotRef.current ? honeypotRef.current.value : '');
+      formDataToSend.append('form_started_at', String(formStartedAt.current));
       
       if (formData.file) {
         formDataToSend.append('file', formData.file);
@@ -164,6 +169,8 @@ const Contact = () => {
         file: null
       });
       
+      formStartedAt.current = Date.now();
+
       // Clear file input
       const fileInput = document.getElementById('file-upload');
       if (fileInput) {
@@ -355,6 +362,11 @@ const Contact = () => {
                 </CardHeader>
                 <CardContent className="px-0 pb-0">
                   <form onSubmit={handleSubmit} className="space-y-6">
+                    {/* Honeypot field: hidden from people, filled in by bots */}
+                    <div aria-hidden="true" style={{ position: 'absolute', left: '-10000px', width: '1px', height: '1px', overflow: 'hidden' }}>
+                      <label htmlFor="website">Website</label>
+                      <input id="website" name="website" type="text" tabIndex={-1} autoComplete="off" ref={honeypotRef} />
+                    </div>
                     <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
                       <div>
                         <Label htmlFor="name">Name *</Label>
@@ -4,10 +4,13 @@ import { Link } from 'react-router-dom';
 import { Button } from '../components/ui/button';
 import { Card, CardContent } from '../components/ui/card';
 import { Badge } from '../components/ui/badge';
-import { projects, skills } from '../data/mockData';
+import { usePortfolioContent } from '../hooks/use-portfolio-content';
 import { ArrowRight, Code, Database, BarChart3, Brain, Download } from 'lucide-react';
 
 const Home = () => {
+  const projects = usePortfolioContent('projects');
+  const skills = usePortfolioContent('skills');
+
   const containerVariants = {
     hidden: { opacity: 0 },
     visible: {
@@ -5,10 +5,11 @@ import { Badge } from '../components/ui/badge';
 import { Button } from '../components/ui/button';
 import { Input } from '../components/ui/input';
 import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogTrigger } from '../components/ui/dialog';
-import { projects } from '../data/mockData';
+import { usePortfolioContent } from '../hooks/use-portfolio-content';
 import { Search, ExternalLink, Github, Calendar, Tag, Filter } from 'lucide-react';
 
 const Projects = () => {
+  const projects = usePortfolioContent('projects');
   const [searchTerm, setSearchTerm] = useState('');
   const [selectedCategory, setSelectedCategory] = useState('All');
   const [selectedProject, setSelectedProject] = useState(null);
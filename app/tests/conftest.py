@@ -0,0 +1,15 @@
+import os
+import sys
+from pathlib import Path
+
+import dotenv
+
+# Backend modules import each other as top-level packages (utils.*, services.*)
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Tests never read the deployment's backend/.env; database.py builds its
+# (lazily connecting) client from these at import time
+dotenv.load_dotenv = lambda *args, **kwargs: False
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "portfolio_test")
@@ -0,0 +1,47 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import routes.contact as contact_routes
+import routes.maintenance as maintenance_routes
+import utils.admin_auth as admin_auth_module
+
+ADMIN_TOKEN = "admin-token"
+
+ADMIN_ENDPOINTS = [
+    ("GET", "/api/contact"),
+    ("GET", "/api/contact/stats"),
+    ("GET", "/api/contact/events"),
+    ("POST", "/api/maintenance/attachments/gc"),
+    ("GET", "/api/maintenance/profiles/20240501T000000-requested-GET-api.collapsed"),
+    ("GET", "/api/maintenance/loop-lag"),
+    ("GET", "/api/contact/attachments/export"),
+]
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(admin_auth_module.admin_auth, "token", ADMIN_TOKEN)
+    app = FastAPI()
+    app.include_router(contact_routes.router, prefix="/api")
+    app.include_router(maintenance_routes.router, prefix="/api")
+    return TestClient(app)
+
+@pytest.mark.parametrize("method,path", ADMIN_ENDPOINTS)
+@pytest.mark.parametrize("headers", [{}, {"X-Admin-Token": "wrong"}, {"X-Admin-Token": ""}])
+def test_admin_endpoints_require_token(client, method, path, headers):
+    response = client.request(method, path, headers=headers)
+    assert response.status_code == 403
+    assert response.json() == {"detail": "Admin token required"}
+
+@pytest.mark.parametrize("method,path", ADMIN_ENDPOINTS)
+def test_admin_endpoints_refuse_everyone_without_configured_token(client, monkeypatch, method, path):
+    monkeypatch.setattr(admin_auth_module.admin_auth, "token", None)
+    assert client.request(method, path, headers={"X-Admin-Token": ""}).status_code == 403
+
+def test_maintenance_accepts_admin_header(client):
+    response = client.get("/api/maintenance/loop-lag", headers={"X-Admin-Token": ADMIN_TOKEN})
+    assert response.status_code == 200
+    assert "lag_ms" in response.json()
+
+def test_admin_token_not_accepted_in_query_string(client):
+    assert client.get(f"/api/maintenance/loop-lag?x_admin_token={ADMIN_TOKEN}").status_code == 403
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+import routes.contact as contact_routes
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+EMAIL = "visitor@example.com"
+
+class FakeSuppressor:
+    def __init__(self):
+        self.claimed = set()
+        self.released = []
+
+    async def should_send(self, email):
+        if email in self.claimed:
+            return False
+        self.claimed.add(email)
+        return True
+
+    async def release(self, email):
+        self.claimed.discard(email)
+        self.released.append(email)
+
+class FakeService:
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.circuit = CircuitBreaker("auto-reply-test")
+        self.sent = 0
+
+    def send_auto_reply(self, contact_data):
+        self.sent += 1
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+@pytest.fixture
+def suppressor(monkeypatch):
+    suppressor = FakeSuppressor()
+    monkeypatch.setattr(contact_routes, "auto_reply_suppressor", suppressor)
+    return suppressor
+
+def use_service(monkeypatch, outcome):
+    service = FakeService(outcome)
+    monkeypatch.setattr(contact_routes, "tenant_email_service", lambda: service)
+    return service
+
+def send():
+    return asyncio.run(contact_routes._send_auto_reply("message-1", EMAIL, {"email": EMAIL}))
+
+def test_sent_auto_reply_keeps_window(monkeypatch, suppressor):
+    service = use_service(monkeypatch, True)
+    assert send()
+    assert not send()
+    assert service.sent == 1
+    assert suppressor.released == []
+
+@pytest.mark.parametrize("outcome", [False, CircuitOpenError("smtp")])
+def test_failed_auto_reply_releases_window(monkeypatch, suppressor, outcome):
+    service = use_service(monkeypatch, outcome)
+    assert not send()
+    assert suppressor.released == [EMAIL]
+
+    # The next submission tries again
+    service.outcome = True
+    assert send()
+    assert service.sent == 2
+
+def test_open_circuit_skips_without_claiming(monkeypatch, suppressor):
+    service = use_service(monkeypatch, True)
+    for _ in range(service.circuit.minimum_calls):
+        service.circuit.record_failure()
+    assert not send()
+    assert service.sent == 0
+    assert suppressor.claimed == set()
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from middleware.body_limit import BodySizeLimitMiddleware
+from utils.metrics import metrics
+
+LIMIT = 1024
+
+def create_app(default_limit=None):
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        return {"size": len(await request.body())}
+
+    @app.post("/swallow")
+    async def swallow(request: Request):
+        # Handlers that turn any read error into their own response must still end in 413
+        try:
+            await request.body()
+        except Exception:
+            return JSONResponse({"detail": "bad request"}, status_code=400)
+        return {"ok": True}
+
+    @app.post("/unlimited")
+    async def unlimited(request: Request):
+        return {"size": len(await request.body())}
+
+    app.add_middleware(
+        BodySizeLimitMiddleware,
+        limits={("POST", "/upload"): LIMIT, ("POST", "/swallow"): LIMIT},
+        default_limit=default_limit
+    )
+    return app
+
+@pytest.fixture
+def client():
+    return TestClient(create_app())
+
+def stream(total: int, size: int = 256):
+    sent = 0
+    while sent < total:
+        yield b"x" * min(size, total - sent)
+        sent += size
+
+def test_body_under_limit_passes(client):
+    response = client.post("/upload", content=b"x" * LIMIT)
+    assert response.status_code == 200
+    assert response.json() == {"size": LIMIT}
+
+def test_declared_length_over_limit(client):
+    before = metrics.snapshot()["counters"].get("requests_rejected_body_too_large", 0)
+    response = client.post("/upload", content=b"x" * (LIMIT + 1))
+    assert response.status_code == 413
+    assert response.headers["connection"] == "close"
+    assert str(LIMIT) in response.json()["detail"]
+    assert metrics.snapshot()["counters"]["requests_rejected_body_too_large"] == before + 1
+
+def test_chunked_body_over_limit(client):
+    response = client.post("/upload", content=stream(LIMIT * 4))
+    assert response.status_code == 413
+
+def test_chunked_body_under_limit(client):
+    response = client.post("/upload", content=stream(LIMIT))
+    assert response.status_code == 200
+    assert response.json() == {"size": LIMIT}
+
+def test_handler_swallowing_the_abort_still_gets_413(client):
+    assert client.post("/swallow", content=stream(LIMIT * 4)).status_code == 413
+    assert client.post("/swallow", content=b"x" * 10).status_code == 200
+
+def test_understated_content_length():
+    messages = [
+        {"type": "http.request", "body": b"x" * 512, "more_body": True},
+        {"type": "http.request", "body": b"x" * 1024, "more_body": False},
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/upload",
+        "raw_path": b"/upload",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"content-length", b"10")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+    asyncio.run(create_app()(scope, receive, send))
+    assert sent[0]["type"] == "http.response.start"
+    assert sent[0]["status"] == 413
+
+def test_routes_without_limit():
+    client = TestClient(create_app())
+    assert client.post("/unlimited", content=b"x" * LIMIT * 4).status_code == 200
+
+    client = TestClient(create_app(default_limit=LIMIT))
+    assert client.post("/unlimited", content=b"x" * LIMIT * 4).status_code == 413
@@ -0,0 +1,106 @@
+import pytest
+
+import utils.circuit_breaker as circuit_breaker
+from services.email_service import EmailService
+from utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, get_breaker
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("test", failure_rate_threshold=0.5, minimum_calls=4, window_size=10, open_seconds=30.0)
+
+def trip(breaker):
+    for _ in range(breaker.minimum_calls):
+        assert breaker.allow()
+        breaker.record_failure()
+
+def test_stays_closed_below_minimum_calls(breaker):
+    for _ in range(breaker.minimum_calls - 1):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+def test_stays_closed_below_failure_rate(breaker):
+    for outcome in [True, True, True, False, True, False]:
+        assert breaker.allow()
+        breaker.record_success() if outcome else breaker.record_failure()
+    assert breaker.state == CLOSED
+
+def test_opens_at_failure_rate(breaker):
+    for outcome in [True, False, True, False]:
+        breaker.allow()
+        breaker.record_success() if outcome else breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.is_open
+
+def test_open_rejects_until_timeout(breaker, clock):
+    trip(breaker)
+    assert not breaker.allow()
+    assert breaker.retry_after == 30.0
+
+    clock[0] += 29.0
+    assert not breaker.allow()
+    assert breaker.retry_after == pytest.approx(1.0)
+
+    clock[0] += 1.0
+    assert breaker.state == HALF_OPEN
+    assert breaker.retry_after == 0.0
+
+def test_half_open_limits_trial_calls(breaker, clock):
+    trip(breaker)
+    clock[0] += 30.0
+    assert breaker.allow()
+    assert not breaker.allow()
+    assert breaker.state == HALF_OPEN
+
+def test_trial_success_closes(breaker, clock):
+    trip(breaker)
+    clock[0] += 30.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["calls_in_window"] == 0
+    assert breaker.allow()
+
+def test_trial_failure_reopens(breaker, clock):
+    trip(breaker)
+    clock[0] += 30.0
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.retry_after == 30.0
+    assert not breaker.allow()
+
+def test_snapshot(breaker, clock):
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.snapshot() == {"state": CLOSED, "failure_rate": 1.0, "calls_in_window": 1, "retry_after_seconds": 0.0}
+
+    for _ in range(breaker.minimum_calls - 1):
+        breaker.allow()
+        breaker.record_failure()
+    clock[0] += 10.0
+    assert breaker.snapshot() == {"state": OPEN, "failure_rate": 0.0, "calls_in_window": 0, "retry_after_seconds": 20.0}
+
+def test_get_breaker_reuses_instance():
+    breaker = get_breaker("shared-test", minimum_calls=2)
+    assert get_breaker("shared-test", minimum_calls=10) is breaker
+    assert breaker.minimum_calls == 2
+
+def test_email_services_share_breaker_per_server():
+    service = EmailService()
+    tenant = service.with_overrides(to_email="tenant@example.com")
+    assert tenant.circuit is service.circuit
+
+    custom = service.with_overrides(smtp_host="smtp.tenant-test.example", smtp_port=465)
+    rebuilt = service.with_overrides(smtp_host="smtp.tenant-test.example", smtp_port=465)
+    other_port = service.with_overrides(smtp_host="smtp.tenant-test.example", smtp_port=587)
+    assert custom.circuit is not service.circuit
+    assert rebuilt.circuit is custom.circuit
+    assert other_port.circuit is not custom.circuit
+    assert custom.circuit.name == "smtp_smtp.tenant-test.example:465"
@@ -0,0 +1,35 @@
+import pytest
+
+from utils.client_ip import ClientIPResolver
+
+@pytest.fixture
+def resolver(monkeypatch):
+    monkeypatch.setenv("TRUSTED_PROXIES", "10.0.0.0/8, 192.168.1.5, not-an-ip")
+    return ClientIPResolver()
+
+@pytest.mark.parametrize("peer,forwarded_for,expected", [
+    # Direct connections ignore the header, which the client controls
+    ("203.0.113.7", None, "203.0.113.7"),
+    ("203.0.113.7", "198.51.100.1", "203.0.113.7"),
+    # Through the ingress
+    ("10.1.2.3", "198.51.100.1", "198.51.100.1"),
+    ("10.1.2.3", "198.51.100.1, 192.168.1.5", "198.51.100.1"),
+    # A spoofed leftmost entry is skipped in favour of the address the proxy saw
+    ("10.1.2.3", "1.2.3.4, 198.51.100.1", "198.51.100.1"),
+    ("10.1.2.3", "2001:db8::1", "2001:db8::1"),
+    # Only trusted hops: the leftmost one is the closest to the client
+    ("10.1.2.3", "10.9.9.9, 10.8.8.8", "10.9.9.9"),
+    # Garbage falls back to the peer
+    ("10.1.2.3", "garbage", "10.1.2.3"),
+    ("10.1.2.3", " , ", "10.1.2.3"),
+    ("10.1.2.3", None, "10.1.2.3"),
+    (None, "198.51.100.1", None),
+])
+def test_resolve(resolver, peer, forwarded_for, expected):
+    assert resolver.resolve(peer, forwarded_for) == expected
+
+def test_default_trusts_private_ranges(monkeypatch):
+    monkeypatch.delenv("TRUSTED_PROXIES", raising=False)
+    resolver = ClientIPResolver()
+    assert resolver.resolve("172.20.0.4", "198.51.100.1") == "198.51.100.1"
+    assert resolver.resolve("198.51.100.9", "198.51.100.1") == "198.51.100.9"
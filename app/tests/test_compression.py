@@ -0,0 +1,43 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from middleware.compression import CompressionMiddleware, brotli
+
+ITEMS = [{"id": index, "title": f"Project {index}", "description": "A portfolio project " * 5} for index in range(2000)]
+
+@pytest.fixture(params=[0, 10 ** 9], ids=["threaded", "inline"])
+def client(request):
+    app = FastAPI()
+
+    @app.get("/api/items")
+    async def items():
+        return ITEMS
+
+    @app.get("/api/small")
+    async def small():
+        return {"ok": True}
+
+    app.add_middleware(CompressionMiddleware, minimum_size=1024, thread_size=request.param)
+    return TestClient(app)
+
+def test_gzip(client):
+    response = client.get("/api/items", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == ITEMS
+
+@pytest.mark.skipif(brotli is None, reason="brotli not installed")
+def test_brotli(client):
+    with client.stream("GET", "/api/items", headers={"Accept-Encoding": "gzip, br"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "br"
+    assert int(response.headers["content-length"]) == len(raw)
+    assert json.loads(brotli.decompress(raw)) == ITEMS
+
+def test_small_bodies_pass_through(client):
+    response = client.get("/api/small", headers={"Accept-Encoding": "gzip, br"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"ok": True}
@@ -0,0 +1,176 @@
+import base64
+import email
+import os
+from contextlib import contextmanager
+from email import policy
+
+import pytest
+
+import services.email_service as email_module
+from services.email_service import EmailService, iter_base64_lines
+
+class FakeSocket:
+    def settimeout(self, timeout):
+        pass
+
+class FakeSMTP:
+    """Records what an SMTP session would put on the wire"""
+
+    def __init__(self):
+        self.sock = FakeSocket()
+        self.sent = []
+        self.replies = [(354, b"go ahead"), (250, b"queued")]
+
+    def mail(self, sender):
+        return 250, b"ok"
+
+    def rcpt(self, recipient):
+        return 250, b"ok"
+
+    def putcmd(self, command):
+        assert command == "data"
+
+    def getreply(self):
+        return self.replies.pop(0)
+
+    def send(self, data):
+        self.sent.append(data)
+
+    @property
+    def data(self) -> bytes:
+        return b"".join(self.sent)
+
+class StartTLSServer(FakeSMTP):
+    """Enforces RFC 3207: after STARTTLS the client must EHLO again before MAIL"""
+
+    instances = []
+
+    def __init__(self, timeout=None):
+        super().__init__()
+        self.commands = []
+        self.greeted = False
+        StartTLSServer.instances.append(self)
+
+    def connect(self, host, port):
+        self.commands.append("connect")
+        return 220, b"ready"
+
+    def ehlo(self, name=""):
+        self.commands.append("ehlo")
+        self.greeted = True
+        return 250, b"ok"
+
+    def ehlo_or_helo_if_needed(self):
+        if not self.greeted:
+            self.ehlo()
+
+    def starttls(self, context=None):
+        self.ehlo_or_helo_if_needed()
+        self.commands.append("starttls")
+        self.greeted = False
+        return 220, b"go ahead"
+
+    def login(self, user, password):
+        self.ehlo_or_helo_if_needed()
+        self.commands.append("login")
+        return 235, b"ok"
+
+    def noop(self):
+        return 250, b"ok"
+
+    def mail(self, sender):
+        self.commands.append("mail")
+        return (250, b"ok") if self.greeted else (503, b"5.5.1 EHLO first")
+
+    def putcmd(self, command):
+        super().putcmd(command)
+        self.replies = [(354, b"go ahead"), (250, b"queued")]
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+def chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+@pytest.mark.parametrize("size", [0, 1, 56, 57, 58, 57 * 1024, 57 * 1024 + 1, 200_003])
+@pytest.mark.parametrize("chunk_size", [1000, 65536])
+def test_base64_lines_round_trip(size, chunk_size):
+    data = os.urandom(size)
+    encoded = b"".join(iter_base64_lines(iter(chunked(data, chunk_size))))
+
+    assert base64.b64decode(encoded) == data
+    lines = encoded.split(b"\r\n")
+    assert lines[-1] == b""
+    assert all(len(line) == 76 for line in lines[:-2])
+    assert all(0 < len(line) <= 76 for line in lines[:-1])
+
+def test_base64_lines_yield_incrementally():
+    blocks = list(iter_base64_lines(iter(chunked(os.urandom(57 * 1024 * 3), 4096))))
+    assert len(blocks) > 1
+
+@pytest.fixture
+def server(monkeypatch):
+    server = FakeSMTP()
+    service = EmailService()
+
+    @contextmanager
+    def session(deadline):
+        yield server
+
+    monkeypatch.setattr(service, "_session", session)
+    server.service = service
+    return server
+
+def unstuff(data: bytes) -> bytes:
+    assert data.endswith(b"\r\n.\r\n")
+    lines = data[:-3].split(b"\r\n")
+    assert not any(line.startswith(b".") and not line.startswith(b"..") for line in lines)
+    return b"\r\n".join(line[1:] if line.startswith(b".") else line for line in lines)
+
+def test_streamed_attachment_is_dot_stuffed_and_intact(server, tmp_path):
+    attachment = os.urandom(300_000)
+    path = tmp_path / "report.bin"
+    path.write_bytes(attachment)
+    text = "Hello\n.hidden line\n..two dots\n.\nend"
+
+    sent = server.service._send_email(
+        "owner@example.com",
+        "Subject",
+        "<p>Hello</p>",
+        text,
+        attachment_path=str(path),
+        attachment_filename="report.bin",
+        attachment_type="application/octet-stream"
+    )
+    assert sent
+    assert not server.replies
+    assert b"\r\n..hidden line\r\n...two dots\r\n..\r\n" in server.data
+
+    message = email.message_from_bytes(unstuff(server.data), policy=policy.default)
+    body = message.get_body(preferencelist=("plain",))
+    assert body.get_content().replace("\r\n", "\n").rstrip("\n") == text
+    [part] = list(message.iter_attachments())
+    assert part.get_filename() == "report.bin"
+    assert part.get_content() == attachment
+
+@pytest.mark.parametrize("username", [None, "owner"])
+def test_session_greets_again_after_starttls(monkeypatch, tmp_path, username):
+    StartTLSServer.instances.clear()
+    monkeypatch.setattr(email_module.smtplib, "SMTP", StartTLSServer)
+    service = EmailService()
+    service.smtp_username = username
+    service.smtp_password = "secret" if username else None
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"notes")
+
+    for _ in range(2):
+        assert service._send_email("owner@example.com", "Subject", "<p>Hi</p>", "Hi", attachment_path=str(path))
+
+    # One connection, reused for the second send
+    [server] = StartTLSServer.instances
+    expected = ["connect", "ehlo", "starttls", "ehlo"] + (["login"] if username else []) + ["mail", "mail"]
+    assert server.commands == expected
+    service.close()
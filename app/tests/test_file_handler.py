@@ -0,0 +1,43 @@
+import asyncio
+import os
+
+import pytest
+
+from utils.file_handler import COMPRESSED_SUFFIX, FileHandler
+
+@pytest.fixture
+def handler(tmp_path):
+    handler = FileHandler(upload_dir=str(tmp_path))
+    handler.compression_enabled = True
+    return handler
+
+def store(handler, tmp_path, name, data, mime_type):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return asyncio.run(handler.compress_stored(str(path), mime_type))
+
+def test_compressible_file_round_trips(handler, tmp_path):
+    data = b"Dear hiring manager, please find my resume attached.\n" * 5000
+    stored_path, stored_size, compression = store(handler, tmp_path, "letter.txt", data, "text/plain")
+
+    assert compression == "zstd"
+    assert stored_path.endswith(COMPRESSED_SUFFIX)
+    assert not os.path.exists(str(tmp_path / "letter.txt"))
+    assert stored_size == os.path.getsize(stored_path) < len(data)
+    assert b"".join(handler.iter_file(stored_path, chunk_size=4096)) == data
+
+def test_incompressible_data_is_kept(handler, tmp_path):
+    data = os.urandom(200_000)
+    stored_path, stored_size, compression = store(handler, tmp_path, "blob.pdf", data, "application/pdf")
+
+    assert compression is None
+    assert stored_path == str(tmp_path / "blob.pdf")
+    assert stored_size == len(data)
+    assert not os.path.exists(stored_path + COMPRESSED_SUFFIX)
+    assert b"".join(handler.iter_file(stored_path)) == data
+
+def test_compressed_formats_are_skipped(handler, tmp_path):
+    data = b"\x89PNG" + b"\x00" * 10_000
+    stored_path, _, compression = store(handler, tmp_path, "image.png", data, "image/png")
+    assert compression is None
+    assert stored_path == str(tmp_path / "image.png")
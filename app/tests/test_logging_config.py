@@ -0,0 +1,49 @@
+import json
+import logging
+import queue
+
+import pytest
+
+from utils.logging_config import DroppingQueueHandler, JSONFormatter
+from utils.metrics import metrics
+
+@pytest.fixture
+def log_queue():
+    log_queue = queue.Queue(maxsize=2)
+    logger = logging.getLogger("tests.logging_config")
+    handler = DroppingQueueHandler(log_queue)
+    logger.addHandler(handler)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    yield log_queue
+    logger.removeHandler(handler)
+
+def test_message_is_rendered_before_queueing(log_queue):
+    tags = ["a"]
+    logging.getLogger("tests.logging_config").info("tags=%s", tags)
+    tags.append("changed-later")
+
+    record = log_queue.get_nowait()
+    assert record.getMessage() == "tags=['a']"
+    assert record.args is None
+    assert json.loads(JSONFormatter().format(record))["message"] == "tags=['a']"
+
+def test_exception_is_rendered_before_queueing(log_queue):
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logging.getLogger("tests.logging_config").exception("failed")
+
+    record = log_queue.get_nowait()
+    assert record.exc_info is None
+    entry = json.loads(JSONFormatter().format(record))
+    assert entry["message"] == "failed"
+    assert "ValueError: boom" in entry["exception"]
+    assert "ValueError: boom" in logging.Formatter().format(record)
+
+def test_full_queue_drops_and_counts(log_queue):
+    before = metrics.snapshot()["counters"].get("log_records_dropped", 0)
+    for index in range(3):
+        logging.getLogger("tests.logging_config").info("record %d", index)
+    assert log_queue.qsize() == 2
+    assert metrics.snapshot()["counters"]["log_records_dropped"] == before + 1
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import services.notification_digest as digest_module
+from services.notification_digest import NotificationDigest
+from services.tenants import tenant_registry
+
+def contact(index: int) -> dict:
+    return {"name": f"Visitor {index}", "email": f"v{index}@example.com", "subject": "Hi", "message": "Hello", "submitted_at": "now"}
+
+class FakeService:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+        self.release = threading.Event()
+
+    def send_contact_digest(self, contacts, deadline=None):
+        self.calls.append((list(contacts), deadline))
+        self.release.wait(self.delay)
+        return True
+
+@pytest.fixture
+def service(monkeypatch):
+    service = FakeService()
+    monkeypatch.setattr(digest_module.tenant_registry, "email_service", lambda tenant: service)
+    return service
+
+@pytest.fixture
+def digest():
+    digest = NotificationDigest()
+    digest.enabled = True
+    return digest
+
+def test_flush_passes_deadline(digest, service):
+    async def run():
+        digest._enqueue(tenant_registry.default, contact(1))
+        deadline = time.monotonic() + 5
+        assert await digest.flush(deadline)
+        return deadline
+
+    deadline = asyncio.run(run())
+    assert service.calls == [([contact(1)], deadline)]
+    assert digest.pending_count == 0
+
+def test_flush_after_deadline_keeps_queue(digest, service):
+    async def run():
+        digest._enqueue(tenant_registry.default, contact(1))
+        assert not await digest.flush(time.monotonic() - 1)
+
+    asyncio.run(run())
+    assert service.calls == []
+    assert digest.pending_count == 1
+
+def test_cancelled_flush_keeps_batch_counted(digest, service):
+    service.delay = 5
+
+    async def run():
+        digest._enqueue(tenant_registry.default, contact(1))
+        digest._enqueue(tenant_registry.default, contact(2))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(digest.flush(), timeout=0.05)
+        service.release.set()
+
+    asyncio.run(run())
+    assert digest.pending_count == 2
+
+def test_threshold_flush_runs_in_background(digest, service):
+    digest.max_messages = 2
+    service.delay = 5
+
+    async def run():
+        started = time.monotonic()
+        assert await digest.notify(contact(1))
+        assert await digest.notify(contact(2))
+        assert time.monotonic() - started < 1
+        assert service.calls == []
+
+        # The digest goes out from the scheduled task, not the submitting request
+        for _ in range(100):
+            if service.calls:
+                break
+            await asyncio.sleep(0.01)
+        assert service.calls[0][0] == [contact(1), contact(2)]
+        service.release.set()
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    assert digest.pending_count == 0
@@ -0,0 +1,32 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from utils.profiling import Profiler, ProfilingMiddleware
+
+PROFILE_TOKEN = "profile-token"
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setenv("PROFILING_TOKEN", PROFILE_TOKEN)
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+    monkeypatch.setenv("PROFILE_SAMPLE_EVERY_N", "0")
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping():
+        return {"ok": True}
+
+    app.add_middleware(ProfilingMiddleware, profiler=Profiler())
+    return TestClient(app)
+
+def test_header_token_profiles_request(client, tmp_path):
+    response = client.get("/api/ping", headers={"X-Profile-Token": PROFILE_TOKEN})
+    assert response.status_code == 200
+    assert (tmp_path / response.headers["X-Profile-File"]).is_file()
+
+def test_query_string_token_is_ignored(client, tmp_path):
+    response = client.get(f"/api/ping?profile={PROFILE_TOKEN}")
+    assert response.status_code == 200
+    assert "X-Profile-File" not in response.headers
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,74 @@
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import routes.contact as contact_routes
+from utils.signed_urls import AttachmentLinkSigner
+
+TENANT_ID = "default"
+MESSAGE_ID = "4f9c2d0e-message"
+
+@pytest.fixture
+def signer(monkeypatch):
+    monkeypatch.setenv("ATTACHMENT_LINK_SECRET", "test-secret")
+    monkeypatch.setenv("PUBLIC_API_URL", "https://api.example.com/")
+    signer = AttachmentLinkSigner()
+    monkeypatch.setattr(contact_routes, "attachment_links", signer)
+    return signer
+
+@pytest.fixture
+def client(signer):
+    app = FastAPI()
+    app.include_router(contact_routes.router, prefix="/api")
+    return TestClient(app)
+
+def test_link_round_trips(signer):
+    link = signer.link(TENANT_ID, MESSAGE_ID, "/t/acme")
+    assert link.startswith(f"https://api.example.com/t/acme/api/contact/{MESSAGE_ID}/attachment?expires=")
+
+    expires = int(time.time()) + 60
+    signature = signer.signature(TENANT_ID, MESSAGE_ID, expires)
+    assert signer.verify(TENANT_ID, MESSAGE_ID, expires, signature)
+    assert not signer.verify("acme", MESSAGE_ID, expires, signature)
+    assert not signer.verify(TENANT_ID, "other-message", expires, signature)
+    assert not signer.verify(TENANT_ID, MESSAGE_ID, expires + 1, signature)
+
+def test_no_links_without_secret(monkeypatch):
+    monkeypatch.delenv("ATTACHMENT_LINK_SECRET", raising=False)
+    signer = AttachmentLinkSigner()
+    assert signer.link(TENANT_ID, MESSAGE_ID) is None
+    assert not signer.verify(TENANT_ID, MESSAGE_ID, int(time.time()) + 60, "0" * 64)
+
+@pytest.mark.parametrize("query", [
+    "",
+    "?expires={expires}",
+    "?signature={signature}",
+    "?expires={expires}&signature={tampered}",
+    "?expires={later}&signature={signature}",
+    "?expires={expired}&signature={expired_signature}",
+])
+def test_download_requires_valid_signature(client, signer, query):
+    expires = int(time.time()) + 60
+    expired = int(time.time()) - 1
+    signature = signer.signature(TENANT_ID, MESSAGE_ID, expires)
+    url = f"/api/contact/{MESSAGE_ID}/attachment" + query.format(
+        expires=expires,
+        later=expires + 3600,
+        signature=signature,
+        tampered=signature[:-1] + ("0" if signature[-1] != "0" else "1"),
+        expired=expired,
+        expired_signature=signer.signature(TENANT_ID, MESSAGE_ID, expired),
+    )
+
+    response = client.get(url)
+    assert response.status_code == 403
+
+def test_admin_download_requires_token(client, monkeypatch):
+    import utils.admin_auth as admin_auth_module
+    monkeypatch.setattr(admin_auth_module.admin_auth, "token", "admin-token")
+
+    assert client.get(f"/api/admin/contact/{MESSAGE_ID}/attachment").status_code == 403
+    response = client.get(f"/api/admin/contact/{MESSAGE_ID}/attachment", headers={"X-Admin-Token": "wrong"})
+    assert response.status_code == 403
@@ -0,0 +1,161 @@
+import asyncio
+import time
+from collections import Counter
+
+import pytest
+
+import services.spam_filter as spam_module
+from services.spam_filter import CountMinSketch, NaiveBayesClassifier, SpamFilter, WindowedSketch, tokenize
+
+SPAM = [
+    "Cheap viagra pills, buy now and win a free casino bonus",
+    "Win money fast, free bonus casino crypto offer, buy now",
+    "Buy cheap followers now, free crypto bonus offer",
+]
+HAM = [
+    "Hi, I saw your portfolio and would like to discuss a frontend role",
+    "Thanks for the talk yesterday, could we schedule a call about the project",
+    "Your project on data pipelines looks great, are you open to a role",
+]
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(spam_module.time, "monotonic", lambda: now[0])
+    return now
+
+class FakeCollection:
+    def __init__(self):
+        self.operations = []
+
+    async def bulk_write(self, operations, ordered=True):
+        self.operations.extend(operations)
+
+@pytest.fixture
+def classifier(monkeypatch):
+    collection = FakeCollection()
+    monkeypatch.setattr(NaiveBayesClassifier, "collection", property(lambda self: collection))
+    classifier = NaiveBayesClassifier()
+    classifier.min_documents = len(SPAM) + len(HAM)
+    classifier.fake_collection = collection
+    return classifier
+
+def train(classifier):
+    async def run():
+        for text in SPAM:
+            await classifier.learn(text, True)
+        for text in HAM:
+            await classifier.learn(text, False)
+    asyncio.run(run())
+
+@pytest.fixture
+def spam_filter(classifier):
+    spam_filter = SpamFilter()
+    spam_filter.enabled = True
+    spam_filter.classifier = classifier
+    return spam_filter
+
+def test_count_min_sketch_never_undercounts():
+    sketch = CountMinSketch(width=64, depth=3)
+    truth = Counter(f"sender-{i % 150}" for i in range(2000))
+    for key, count in truth.items():
+        for _ in range(count):
+            sketch.add(key)
+    assert all(sketch.estimate(key) >= count for key, count in truth.items())
+    assert sketch.estimate("never-seen") >= 0
+
+def test_count_min_sketch_exact_when_sparse():
+    sketch = CountMinSketch()
+    assert [sketch.add("a") for _ in range(3)] == [1, 2, 3]
+    assert sketch.estimate("a") == 3
+    assert sketch.estimate("b") == 0
+
+def test_windowed_sketch_rotation(clock):
+    sketch = WindowedSketch(window_seconds=60)
+    assert sketch.add("a") == 1
+    assert sketch.add("a") == 2
+
+    # One window later the old counts are still remembered
+    clock[0] += 60
+    assert sketch.add("a") == 3
+
+    # Two windows later only the previous window is left
+    clock[0] += 60
+    assert sketch.add("a") == 2
+
+    # Idle for two windows or more forgets everything
+    clock[0] += 120
+    assert sketch.add("a") == 1
+
+def test_tokenize_collapses_links():
+    tokens = tokenize("Visit https://spam.example/offer?x=1 or www.cheap.biz and spam.ru NOW now")
+    assert tokens.count("__link__") == 1
+    assert "now" in tokens and "visit" in tokens
+    assert not any("spam" in token or "cheap" in token for token in tokens)
+    assert tokenize("no links here") == ["no", "links", "here"]
+
+def test_tokenize_caps_tokens():
+    assert len(tokenize(" ".join(f"word{i}" for i in range(1000)), max_tokens=50)) == 50
+
+def test_classifier_probability(classifier):
+    assert not classifier.ready
+    train(classifier)
+    assert classifier.ready
+    assert classifier.document_counts == [len(HAM), len(SPAM)]
+    assert classifier.spam_probability(tokenize("free casino bonus, buy now")) > 0.9
+    assert classifier.spam_probability(tokenize("could we discuss the frontend role")) < 0.1
+    assert classifier.spam_probability(["unknown-token"]) == pytest.approx(0.5)
+
+def test_classifier_unlearn(classifier):
+    train(classifier)
+    tokens = tokenize(SPAM[0])
+    before = classifier.spam_probability(tokens)
+    asyncio.run(classifier.learn(SPAM[0], True, weight=-1))
+    assert classifier.document_counts == [len(HAM), len(SPAM) - 1]
+    assert classifier.spam_probability(tokens) < before
+    assert sum(classifier.token_totals) == sum(sum(counts) for counts in classifier.token_counts.values())
+
+def test_classifier_mirrors_counts(classifier):
+    asyncio.run(classifier.learn("buy now", True))
+    updates = {op._filter["_id"]: op._doc for op in classifier.fake_collection.operations}
+    assert updates == {
+        spam_module.MODEL_STATS_ID: {"$inc": {"spam": 1}},
+        "buy": {"$inc": {"spam": 1}},
+        "now": {"$inc": {"spam": 1}},
+    }
+
+def test_honeypot(spam_filter):
+    verdict = spam_filter.evaluate("bot@example.com", "Hello", "Hello there", honeypot="http://x")
+    assert verdict.is_spam
+    assert verdict.reasons == ["honeypot"]
+
+def test_clean_submission(spam_filter):
+    verdict = spam_filter.evaluate("jane@example.com", "Role", HAM[0], form_started_at=(time.time() - 60) * 1000)
+    assert not verdict.is_spam
+    assert verdict.reasons == []
+    assert verdict.spam_probability is None
+
+def test_fast_submit_and_links(spam_filter):
+    message = "see https://a.example https://b.example https://c.example https://d.example"
+    verdict = spam_filter.evaluate("bot@example.com", "Offer", message, form_started_at=time.time() * 1000)
+    assert verdict.reasons == ["fast_submit", "link_density"]
+    assert verdict.is_spam
+
+def test_repeat_sender(spam_filter):
+    for _ in range(spam_filter.repeat_sender_limit):
+        assert "repeat_sender" not in spam_filter.evaluate("a@example.com", "Hi", "Hello", ip_address="10.0.0.1").reasons
+    # Same IP from a new address still counts as a repeat
+    verdict = spam_filter.evaluate("b@example.com", "Hi", "Hello", ip_address="10.0.0.1")
+    assert verdict.reasons == ["repeat_sender"]
+
+def test_bayes_stage(spam_filter):
+    train(spam_filter.classifier)
+    verdict = spam_filter.evaluate("x@example.com", "Free bonus", "Buy cheap crypto now, casino offer")
+    assert verdict.reasons == ["bayes"]
+    assert verdict.spam_probability > 0.9
+    assert not verdict.is_spam
+    assert verdict.score == pytest.approx(spam_filter.bayes_weight * (2 * verdict.spam_probability - 1), abs=1e-3)
+
+def test_disabled(spam_filter):
+    spam_filter.enabled = False
+    assert not spam_filter.evaluate("bot@example.com", "", "", honeypot="filled").is_spam
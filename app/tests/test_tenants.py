@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+import services.tenants as tenants_module
+from services.email_service import EmailService
+from services.tenants import TenantRegistry
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = [dict(doc) for doc in docs]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.docs:
+            raise StopAsyncIteration
+        return self.docs.pop(0)
+
+class FakeDatabase:
+    def __init__(self):
+        self.tenant_docs = []
+
+    @property
+    def tenants(self):
+        return self
+
+    def find(self, query):
+        return FakeCursor(self.tenant_docs)
+
+@pytest.fixture
+def database(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(tenants_module, "db", database)
+    return database
+
+@pytest.fixture
+def closed(monkeypatch):
+    closed = []
+    monkeypatch.setattr(EmailService, "close", lambda self, timeout=None: closed.append(self))
+    return closed
+
+def acme(**settings):
+    return {"_id": "acme", "hosts": ["acme.example"], **settings}
+
+def test_email_services_survive_reload(database, closed):
+    database.tenant_docs = [acme(smtp_host="smtp.acme.example"), {"_id": "beta", "to_email": "beta@example.com"}]
+    registry = TenantRegistry()
+
+    async def run():
+        await registry.load()
+        acme_service = registry.email_service(registry.get("acme"))
+        beta_service = registry.email_service(registry.get("beta"))
+
+        await registry.load()
+        assert registry.email_service(registry.get("acme")) is acme_service
+        assert registry.email_service(registry.get("beta")) is beta_service
+        assert closed == []
+
+        # Changed settings get a new service; removed tenants are dropped; both are closed
+        database.tenant_docs = [acme(smtp_host="smtp2.acme.example")]
+        await registry.load()
+        await asyncio.sleep(0.05)
+        assert registry.email_service(registry.get("acme")) is not acme_service
+        assert {id(service) for service in closed} == {id(acme_service), id(beta_service)}
+
+        closed.clear()
+        await registry.close_email_services()
+        assert len(closed) == 1
+
+    asyncio.run(run())
@@ -0,0 +1,49 @@
+import io
+import os
+import zipfile
+
+from utils.zip_stream import ZipStreamWriter
+
+DATE_TIME = (2024, 5, 1, 12, 30, 0)
+
+def chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+def build(entries):
+    writer = ZipStreamWriter()
+    parts = []
+    for arcname, data, compress in entries:
+        parts.extend(writer.add_file(arcname, chunked(data, 64 * 1024), compress=compress, date_time=DATE_TIME))
+    parts.append(writer.add_bytes("manifest.txt", b"two files\n"))
+    parts.append(writer.close())
+    return parts
+
+def test_archive_reopens_intact():
+    text = b"line of compressible text\n" * 20_000
+    binary = os.urandom(300_000)
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(build([
+        ("messages/notes.txt", text, True),
+        ("messages/photo.jpg", binary, False),
+    ]))))
+
+    assert archive.testzip() is None
+    assert archive.namelist() == ["messages/notes.txt", "messages/photo.jpg", "manifest.txt"]
+    assert archive.read("messages/notes.txt") == text
+    assert archive.read("messages/photo.jpg") == binary
+    assert archive.read("manifest.txt") == b"two files\n"
+
+    notes, photo, _ = archive.infolist()
+    assert notes.compress_type == zipfile.ZIP_DEFLATED
+    assert notes.compress_size < notes.file_size
+    assert photo.compress_type == zipfile.ZIP_STORED
+    assert notes.date_time == DATE_TIME
+
+def test_output_is_streamed():
+    parts = build([("large.bin", os.urandom(1024 * 1024), False)])
+    assert len(parts) > 10
+    assert max(len(part) for part in parts) < 256 * 1024
+
+def test_empty_entry():
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(build([("empty.txt", b"", True)]))))
+    assert archive.testzip() is None
+    assert archive.read("empty.txt") == b""